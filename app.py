@@ -5,6 +5,9 @@ FastAPI backend for the Document Portal.
 """
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+
+from utils.metrics import METRICS
 
 # Create the FastAPI application
 app = FastAPI(title="Document Portal", version="0.1.0")
@@ -16,4 +19,10 @@ def root():
     return {"status": "ok", "message": "Document Portal is running"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus scrape endpoint for stage timings, counters and LLM token usage."""
+    return PlainTextResponse(METRICS.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 # Run with:  uvicorn app:app --reload
@@ -0,0 +1 @@
+# Package for reproducible performance benchmarks.
@@ -0,0 +1,73 @@
+"""Offline stand-ins for the LLM and embedding model used in benchmarks."""
+
+from __future__ import annotations
+
+import json
+import math
+import time
+import zlib
+from typing import Any
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+FAKE_METADATA = {
+    "Summary": ["Synthetic benchmark document."],
+    "Title": "Synthetic Document",
+    "Author": ["Benchmark"],
+    "DateCreated": "Not Available",
+    "LastModifiedDate": "Not Available",
+    "Publisher": "Not Available",
+    "Language": "English",
+    "PageCount": "Not Available",
+    "SentimentTone": "Neutral",
+}
+
+
+class LatencyFakeChatModel(BaseChatModel):
+    """Chat model that sleeps ``latency`` seconds and returns a fixed response.
+
+    Reports approximate ``usage_metadata`` (4 chars per token) so token
+    accounting paths are exercised.
+    """
+
+    response: str = json.dumps(FAKE_METADATA)
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "latency-fake-chat"
+
+    def _generate(self, messages: list[BaseMessage], stop: list[str] | None = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        if self.latency > 0:
+            time.sleep(self.latency)
+        input_tokens = sum(len(str(m.content)) for m in messages) // 4
+        output_tokens = len(self.response) // 4
+        message = AIMessage(
+            content=self.response,
+            usage_metadata={"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens},
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class HashingEmbeddings(Embeddings):
+    """Bag-of-words hashing embeddings: deterministic and lexically meaningful."""
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _embed(self, text: str) -> list[float]:
+        vec = [0.0] * self.dim
+        for word in text.lower().split():
+            vec[zlib.crc32(word.encode("utf-8")) % self.dim] += 1.0
+        norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+        return [v / norm for v in vec]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed(text)
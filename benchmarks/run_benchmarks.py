@@ -0,0 +1,274 @@
+"""Reproducible benchmarks for ingestion, analysis and retrieval.
+
+Everything runs offline: synthetic PDFs, a fake LLM with injected latency and
+hashing embeddings. Results are written as JSON and can be compared against a
+stored baseline (non-zero exit code on regression).
+
+Run with:
+    python -m benchmarks.run_benchmarks --output bench_results.json
+    python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --save-baseline benchmarks/baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import logging
+import platform
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from benchmarks.fakes import HashingEmbeddings, LatencyFakeChatModel
+from benchmarks.synthetic import make_pdf_corpus, make_retrieval_corpus
+from logger.custom_logger import CustomLogger
+from utils.metrics import METRICS
+
+try:
+    import psutil
+except ImportError:  # Optional: fall back to resource (POSIX) or no RSS data.
+    psutil = None
+
+
+# Direction of "better" for each metric, used by the baseline comparison.
+HIGHER_IS_BETTER = {"pages_per_sec", "mb_per_sec", "docs_per_sec", "qps", "recall_at_k"}
+LOWER_IS_BETTER = {"peak_rss_mb", "p50_ms", "p95_ms", "overhead_ms"}
+
+
+class PeakRssSampler:
+    """Sample process RSS in a background thread and keep the maximum (MiB)."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak_mb: float | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def _rss_mb() -> float | None:
+        if psutil is not None:
+            return psutil.Process().memory_info().rss / (1024 * 1024)
+        try:
+            import resource
+
+            # ru_maxrss is KiB on Linux, bytes on macOS.
+            scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+        except ImportError:
+            return None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            rss = self._rss_mb()
+            if rss is not None:
+                self.peak_mb = max(self.peak_mb or 0.0, rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "PeakRssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        rss = self._rss_mb()
+        if rss is not None:
+            self.peak_mb = max(self.peak_mb or 0.0, rss)
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))] if ordered else 0.0
+
+
+def bench_ingestion(files: int, pages: int, chars_per_page: int, seed: int) -> dict[str, Any]:
+    """Measure ``load_pdfs`` pages/sec, MB/sec and peak RSS on synthetic PDFs."""
+    from src.document_ingestion.data_ingestion import load_pdfs
+
+    with tempfile.TemporaryDirectory(prefix="bench_ingest_") as tmp:
+        root = Path(tmp)
+        pdfs = make_pdf_corpus(root, files, pages, chars_per_page, seed=seed)
+        total_bytes = sum(p.stat().st_size for p in pdfs)
+
+        with PeakRssSampler() as rss:
+            start = time.perf_counter()
+            docs = load_pdfs(root)
+            elapsed = time.perf_counter() - start
+
+    return {
+        "files": files,
+        "pages": len(docs),
+        "bytes": total_bytes,
+        "seconds": elapsed,
+        "pages_per_sec": len(docs) / elapsed if elapsed else 0.0,
+        "mb_per_sec": total_bytes / (1024 * 1024) / elapsed if elapsed else 0.0,
+        "peak_rss_mb": rss.peak_mb,
+    }
+
+
+def bench_analysis(docs: int, chars_per_doc: int, latency: float, seed: int) -> dict[str, Any]:
+    """Measure ``DocumentAnalyzer.analyze_document`` throughput against a fake LLM."""
+    from benchmarks.synthetic import make_text, make_vocabulary
+    from src.document_analyzer.data_analysis import DocumentAnalyzer
+    import random
+
+    rng = random.Random(seed)
+    vocab = make_vocabulary()
+    texts = [make_text(rng, vocab, chars_per_doc) for _ in range(docs)]
+    analyzer = DocumentAnalyzer(llm=LatencyFakeChatModel(latency=latency))
+
+    latencies: list[float] = []
+    start = time.perf_counter()
+    for text in texts:
+        t0 = time.perf_counter()
+        analyzer.analyze_document(text)
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+
+    p50 = _percentile(latencies, 0.50)
+    return {
+        "docs": docs,
+        "injected_latency_ms": latency * 1000,
+        "seconds": elapsed,
+        "docs_per_sec": docs / elapsed if elapsed else 0.0,
+        "p50_ms": p50 * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        # Time spent outside the (fake) model call: prompt building, parsing, bookkeeping.
+        "overhead_ms": max(0.0, p50 - latency) * 1000,
+    }
+
+
+def bench_retrieval(docs: int, chars_per_doc: int, queries: int, k: int, seed: int) -> dict[str, Any]:
+    """Measure FAISS similarity search QPS and recall@k on a synthetic corpus."""
+    from langchain_community.vectorstores import FAISS
+
+    texts, pairs = make_retrieval_corpus(docs, chars_per_doc, queries, seed=seed)
+    store = FAISS.from_texts(texts, HashingEmbeddings(), metadatas=[{"doc_index": i} for i in range(len(texts))])
+
+    hits = 0
+    latencies: list[float] = []
+    start = time.perf_counter()
+    for query, target in pairs:
+        t0 = time.perf_counter()
+        results = store.similarity_search(query, k=k)
+        latencies.append(time.perf_counter() - t0)
+        hits += any(r.metadata.get("doc_index") == target for r in results)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "docs": docs,
+        "queries": queries,
+        "k": k,
+        "seconds": elapsed,
+        "qps": queries / elapsed if elapsed else 0.0,
+        "recall_at_k": hits / queries if queries else 0.0,
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+    }
+
+
+def compare_to_baseline(results: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Return human-readable regressions where a metric is worse than baseline by > tolerance."""
+    regressions: list[str] = []
+    for suite, metrics in results.get("suites", {}).items():
+        base_metrics = baseline.get("suites", {}).get(suite, {})
+        for name, value in metrics.items():
+            base = base_metrics.get(name)
+            if not isinstance(value, (int, float)) or not isinstance(base, (int, float)) or base == 0:
+                continue
+            change = (value - base) / abs(base)
+            if name in HIGHER_IS_BETTER and change < -tolerance:
+                regressions.append(f"{suite}.{name}: {value:.4g} vs baseline {base:.4g} ({change:+.1%})")
+            elif name in LOWER_IS_BETTER and change > tolerance:
+                regressions.append(f"{suite}.{name}: {value:.4g} vs baseline {base:.4g} ({change:+.1%})")
+    return regressions
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Document Portal benchmarks")
+    parser.add_argument("--suites", default="ingestion,analysis,retrieval", help="Comma-separated suites to run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--files", type=int, default=5, help="Synthetic PDFs for ingestion")
+    parser.add_argument("--pages", type=int, default=20, help="Pages per synthetic PDF")
+    parser.add_argument("--chars-per-page", type=int, default=3000)
+    parser.add_argument("--analysis-docs", type=int, default=20)
+    parser.add_argument("--analysis-chars", type=int, default=12000)
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0, help="Injected fake LLM latency")
+    parser.add_argument("--retrieval-docs", type=int, default=2000)
+    parser.add_argument("--retrieval-chars", type=int, default=800)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--output", type=Path, help="Write JSON results here (default: stdout)")
+    parser.add_argument("--baseline", type=Path, help="Compare against this results JSON")
+    parser.add_argument("--save-baseline", type=Path, help="Also write results to this baseline path")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+@contextlib.contextmanager
+def _app_logs_to_stderr():
+    """Point the app's stdout log handlers at stderr so stdout carries only the JSON results."""
+    CustomLogger()  # make sure the handlers exist before redirecting them
+    names = ["document_portal", "urllib3", "httpx", "httpcore", "openai"]
+    moved = [h for name in names for h in logging.getLogger(name).handlers if isinstance(h, logging.StreamHandler) and getattr(h, "stream", None) is sys.stdout]
+    for handler in set(moved):
+        handler.setStream(sys.stderr)
+    try:
+        yield
+    finally:
+        for handler in set(moved):
+            handler.setStream(sys.stdout)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    suites: dict[str, Callable[[], dict[str, Any]]] = {
+        "ingestion": lambda: bench_ingestion(args.files, args.pages, args.chars_per_page, args.seed),
+        "analysis": lambda: bench_analysis(args.analysis_docs, args.analysis_chars, args.llm_latency_ms / 1000, args.seed),
+        "retrieval": lambda: bench_retrieval(args.retrieval_docs, args.retrieval_chars, args.queries, args.k, args.seed),
+    }
+    selected = [s.strip() for s in args.suites.split(",") if s.strip()]
+    unknown = set(selected) - set(suites)
+    if unknown:
+        raise SystemExit(f"Unknown suites: {', '.join(sorted(unknown))}")
+
+    METRICS.reset()
+    results: dict[str, Any] = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+    }
+    with _app_logs_to_stderr():
+        results["suites"] = {name: suites[name]() for name in selected}
+    # Per-stage breakdown collected by the instrumentation layer.
+    results["stages"] = METRICS.snapshot()
+
+    payload = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(payload, encoding="utf-8")
+    else:
+        print(payload)
+    if args.save_baseline:
+        args.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.save_baseline.write_text(payload, encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("REGRESSIONS:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+        print("No regressions against baseline.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
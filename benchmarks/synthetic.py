@@ -0,0 +1,67 @@
+"""Deterministic synthetic inputs (PDFs and text corpora) for benchmarks."""
+
+from __future__ import annotations
+
+from pathlib import Path
+import random
+
+import fitz  # PyMuPDF
+
+
+def make_vocabulary(size: int = 5000, seed: int = 7) -> list[str]:
+    """Return ``size`` unique pseudo-words, stable for a given seed."""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words: set[str] = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(3, 10))))
+    return sorted(words)
+
+
+def make_text(rng: random.Random, vocab: list[str], chars: int) -> str:
+    """Return roughly ``chars`` characters of space-separated vocabulary words."""
+    out: list[str] = []
+    length = 0
+    while length < chars:
+        word = rng.choice(vocab)
+        out.append(word)
+        length += len(word) + 1
+    return " ".join(out)
+
+
+def make_pdf(path: Path, pages: int, chars_per_page: int, seed: int = 0) -> Path:
+    """Write a PDF with ``pages`` pages of ~``chars_per_page`` extractable characters."""
+    rng = random.Random(seed)
+    vocab = make_vocabulary()
+    doc = fitz.open()
+    try:
+        for _ in range(pages):
+            page = doc.new_page()
+            page.insert_textbox(page.rect + (36, 36, -36, -36), make_text(rng, vocab, chars_per_page), fontsize=6)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        doc.save(str(path))
+    finally:
+        doc.close()
+    return path
+
+
+def make_pdf_corpus(root: Path, files: int, pages: int, chars_per_page: int, seed: int = 0) -> list[Path]:
+    """Write ``files`` synthetic PDFs under ``root`` and return their paths."""
+    return [make_pdf(root / f"synthetic_{i:04d}.pdf", pages, chars_per_page, seed=seed + i) for i in range(files)]
+
+
+def make_retrieval_corpus(docs: int, chars_per_doc: int, queries: int, query_words: int = 8, seed: int = 0) -> tuple[list[str], list[tuple[str, int]]]:
+    """Return ``(texts, [(query, relevant_doc_index), ...])``.
+
+    Each query is a handful of words sampled from one document, so that
+    document is the single relevant hit used for recall@k.
+    """
+    rng = random.Random(seed)
+    vocab = make_vocabulary(seed=seed + 1)
+    texts = [make_text(rng, vocab, chars_per_doc) for _ in range(docs)]
+    pairs: list[tuple[str, int]] = []
+    for _ in range(queries):
+        target = rng.randrange(docs)
+        words = texts[target].split()
+        pairs.append((" ".join(rng.sample(words, min(query_words, len(words)))), target))
+    return texts, pairs
@@ -1,27 +1,194 @@
 """Simple class-based exception handling utility powered only by Loguru."""
 
+import atexit
 import os
+import sys
+import threading
+import time
 import traceback
 
 from loguru import logger
 
+from logger.log_rotation import (
+    DEFAULT_BACKUP_COUNT,
+    DEFAULT_COMPRESSION,
+    DEFAULT_MAX_BYTES,
+    DEFAULT_RETENTION_DAYS,
+    LoguruArchiver,
+    LoguruUtcRotation,
+    process_log_suffix,
+)
+from utils.metrics import METRICS
+
+_exception_logger = logger.bind(source="exception_handler")
+
+
+class _Window:
+    """Suppression state for one error key (strings only: no exception or traceback is kept)."""
+
+    __slots__ = ("started", "suppressed", "first", "first_subject", "subjects", "timer")
+
+    def __init__(self, started: float, first: str, first_subject: str):
+        self.started = started
+        self.suppressed = 0
+        self.first = first
+        self.first_subject = first_subject
+        self.subjects: list[str] = []
+        self.timer: threading.Timer | None = None
+
+
+def _subject(exception: Exception) -> str:
+    return getattr(exception, "message", None) or str(exception)
+
+
+class ExceptionReporter:
+    """Process-wide, rate-limited exception logging.
+
+    The first occurrence of an error (same type + raising code location, or
+    the message for errors that were never raised, or an explicit ``key``)
+    is logged immediately. Repeats inside ``window_seconds`` are only
+    counted and logged once as "repeated N times" when the window closes,
+    listing up to ``max_subjects`` distinct messages so no failing item goes
+    unnamed. Closed windows are dropped and at most ``max_windows`` are
+    tracked, so memory stays bounded in long-running processes. Nothing is
+    written to stdout and tracebacks are never formatted on this path. The
+    exception log is configured on first use.
+    """
+
+    def __init__(self, window_seconds: float = 60.0, max_subjects: int = 5, max_windows: int = 1024):
+        self.window_seconds = window_seconds
+        self.max_subjects = max_subjects
+        self.max_windows = max_windows
+        # Ordered oldest window first (windows are re-inserted when reopened).
+        self._seen: dict[tuple, _Window] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(exception: Exception) -> tuple:
+        error = getattr(exception, "original_error", None) or exception
+        file_name, line_number = _last_frame(error.__traceback__)
+        if file_name is None:
+            # Never raised: no location to group by, so only identical messages merge.
+            return type(error).__name__, None, None, str(exception)
+        return type(error).__name__, file_name, line_number
+
+    def report(self, exception: Exception, key: tuple | None = None) -> bool:
+        """Log ``exception`` unless it is a recent duplicate. Returns True if it was logged."""
+        if not ExceptionHandler._is_configured:
+            ExceptionHandler()
+        key = key or self._key(exception)
+        now = time.monotonic()
+        closed: list[_Window] = []
+        with self._lock:
+            window = self._seen.get(key)
+            if window is not None and now - window.started < self.window_seconds:
+                window.suppressed += 1
+                subject = _subject(exception)
+                if len(window.subjects) < self.max_subjects and subject not in window.subjects and subject != window.first_subject:
+                    window.subjects.append(subject)
+                if window.timer is None:
+                    window.timer = threading.Timer(window.started + self.window_seconds - now, self._expire, (key, window))
+                    window.timer.daemon = True
+                    window.timer.start()
+                METRICS.incr("exceptions_suppressed_total")
+                return False
+            if window is not None:
+                self._close(key, window, closed)
+            closed.extend(self._sweep(now))
+            self._seen[key] = _Window(now, str(exception), _subject(exception))
+
+        for old in closed:
+            self._emit_repeats(old)
+        _exception_logger.error(str(exception))
+        METRICS.incr("exceptions_total", type=key[0])
+        return True
+
+    def _close(self, key: tuple, window: _Window, closed: list[_Window]) -> None:
+        del self._seen[key]
+        if window.timer is not None:
+            window.timer.cancel()
+        if window.suppressed:
+            closed.append(window)
+
+    def _sweep(self, now: float) -> list[_Window]:
+        """Drop closed windows and the oldest ones beyond ``max_windows`` (lock held)."""
+        closed: list[_Window] = []
+        for key, window in list(self._seen.items()):
+            expired = now - window.started >= self.window_seconds
+            if not expired and len(self._seen) < self.max_windows:
+                break
+            self._close(key, window, closed)
+        return closed
+
+    def _emit_repeats(self, window: _Window) -> None:
+        also = f"; also: {', '.join(window.subjects)}" if window.subjects else ""
+        _exception_logger.error(f"{window.first} (repeated {window.suppressed} more times in {self.window_seconds:.0f}s{also})")
+
+    def _expire(self, key: tuple, window: _Window) -> None:
+        """Timer callback: close ``window`` and log its repeat count."""
+        with self._lock:
+            if self._seen.get(key) is not window:
+                return
+            del self._seen[key]
+        self._emit_repeats(window)
+
+    def flush(self) -> None:
+        """Log every pending repeat count now (runs at exit)."""
+        with self._lock:
+            pending = [w for w in self._seen.values() if w.suppressed]
+            for window in self._seen.values():
+                if window.timer is not None:
+                    window.timer.cancel()
+            self._seen.clear()
+        for window in pending:
+            self._emit_repeats(window)
+
+
+REPORTER = ExceptionReporter()
+atexit.register(REPORTER.flush)
+
+
+def report_exception(message: str, error: Exception, key: tuple | None = None) -> "DocumentPortalException":
+    """Wrap ``error``, log it through the shared rate-limited reporter and return it (no raise).
+
+    Cheap enough for per-item failures in large batches.
+    """
+    app_exception = DocumentPortalException(message=message, original_error=error)
+    REPORTER.report(app_exception, key=key)
+    return app_exception
+
 
 class ExceptionHandler:
+    """Configures the exception log once per process; instances are cheap to create."""
+
     _is_configured = False
+    _lock = threading.Lock()
 
-    def __init__(self, log_dir="logs", level="ERROR"):
+    def __init__(
+        self,
+        log_dir="logs",
+        level="ERROR",
+        max_bytes=DEFAULT_MAX_BYTES,
+        compression=DEFAULT_COMPRESSION,
+        retention_days=DEFAULT_RETENTION_DAYS,
+        backup_count=DEFAULT_BACKUP_COUNT,
+    ):
         self.logs_dir = os.path.join(os.getcwd(), log_dir)
-        os.makedirs(self.logs_dir, exist_ok=True)
-        self.log_file_path = os.path.join(self.logs_dir, "exceptions.log")
+        # Rotation renames the file, so only one process may write each name.
+        self.log_file_path = os.path.join(self.logs_dir, f"exceptions{process_log_suffix(self.logs_dir)}.log")
         self.level = level
-
-        print(f"[ExceptionHandler] Log directory ready: {self.logs_dir}")
-        print(f"[ExceptionHandler] Exception log file: {self.log_file_path}")
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.retention_days = retention_days
+        self.backup_count = backup_count
 
         if not ExceptionHandler._is_configured:
-            self._configure_logger()
+            with ExceptionHandler._lock:
+                if not ExceptionHandler._is_configured:
+                    self._configure_logger()
 
     def _configure_logger(self):
+        os.makedirs(self.logs_dir, exist_ok=True)
         # Remove only the default stderr handler (id=0), not ALL loguru handlers
         try:
             logger.remove(0)
@@ -32,27 +199,35 @@ class ExceptionHandler:
             level=self.level,
             encoding="utf-8",
             enqueue=True,
+            # Rotate on UTC day or size; rotated files are renamed to
+            # exceptions[_<pid>].<timestamp>.log and compressed in the background.
+            rotation=LoguruUtcRotation(self.max_bytes),
+            compression=LoguruArchiver(
+                os.path.join(self.logs_dir, "exceptions*.*.log*"),
+                compression=self.compression,
+                retention_days=self.retention_days,
+                backup_count=self.backup_count,
+            ),
             backtrace=False,
             diagnose=False,
             format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {extra[source]} | {message}",
             filter=lambda record: record["extra"].get("source") == "exception_handler",
         )
+        # Console copy goes to stderr (never stdout) through loguru's queue.
         logger.add(
-            lambda message: print(message, end=""),
+            sys.stderr,
             level=self.level,
+            enqueue=True,
             format="{time:HH:mm:ss} | {level} | {extra[source]} | {message}",
             filter=lambda record: record["extra"].get("source") == "exception_handler",
         )
         ExceptionHandler._is_configured = True
-        print("[ExceptionHandler] Loguru configured successfully.")
 
     def create_exception(self, message: str, error: Exception | None = None):
-        print("[ExceptionHandler] Creating DocumentPortalException.")
         return DocumentPortalException(message=message, original_error=error)
 
     def log_exception(self, exception: Exception):
-        print("[ExceptionHandler] Logging exception.")
-        logger.bind(source="exception_handler").error(str(exception))
+        REPORTER.report(exception)
 
     def handle_exception(self, message: str, error: Exception) -> None:
         """Create, log, and raise a DocumentPortalException in one call.
@@ -63,6 +238,15 @@ class ExceptionHandler:
         raise app_exception
 
 
+def _last_frame(tb) -> tuple[str | None, int | None]:
+    """Return (file, line) of the innermost traceback frame without formatting anything."""
+    if tb is None:
+        return None, None
+    while tb.tb_next is not None:
+        tb = tb.tb_next
+    return tb.tb_frame.f_code.co_filename, tb.tb_lineno
+
+
 class DocumentPortalException(Exception):
     def __init__(self, message: str, original_error: Exception | None = None):
         self.message = message
@@ -70,10 +254,8 @@ class DocumentPortalException(Exception):
         self.file_name = None
         self.line_number = None
 
-        if original_error is not None and original_error.__traceback__ is not None:
-            last_frame = traceback.extract_tb(original_error.__traceback__)[-1]
-            self.file_name = last_frame.filename
-            self.line_number = last_frame.lineno
+        if original_error is not None:
+            self.file_name, self.line_number = _last_frame(original_error.__traceback__)
 
         super().__init__(self.__str__())
 
@@ -82,6 +264,11 @@ class DocumentPortalException(Exception):
             return f"Error in [{self.file_name}] at line [{self.line_number}]: {self.message}"
         return self.message
 
+    def format_traceback(self) -> str:
+        """Full traceback of the original error, formatted only when asked for."""
+        error = self.original_error or self
+        return "".join(traceback.format_exception(type(error), error, error.__traceback__))
+
 
 # if __name__ == "__main__":
 #     handler = ExceptionHandler()
@@ -5,19 +5,43 @@ from datetime import datetime, timezone
 
 import structlog
 
+from logger.log_rotation import (
+    DEFAULT_BACKUP_COUNT,
+    DEFAULT_COMPRESSION,
+    DEFAULT_MAX_BYTES,
+    DEFAULT_RETENTION_DAYS,
+    UtcRotatingFileHandler,
+    process_log_suffix,
+)
+
 
 class CustomLogger:
     _configured = False
 
-    def __init__(self, log_dir="logs", level=logging.INFO):
+    def __init__(
+        self,
+        log_dir="logs",
+        level=logging.INFO,
+        max_bytes=DEFAULT_MAX_BYTES,
+        compression=DEFAULT_COMPRESSION,
+        retention_days=DEFAULT_RETENTION_DAYS,
+        backup_count=DEFAULT_BACKUP_COUNT,
+    ):
         self.level = level
         self.logs_dir = os.path.join(os.getcwd(), log_dir)
         os.makedirs(self.logs_dir, exist_ok=True)
 
         # JSON log file (structlog) — e.g. logs/2026-02-28.log
+        # Rolls over on UTC day change or at max_bytes; rotated files are
+        # compressed ("gz" or "zst") in the background and pruned by retention.
+        # Secondary processes write logs/<date>_<pid>.log (one writer per file).
         self.log_file_path = os.path.join(
-            self.logs_dir, f"{datetime.now(timezone.utc).strftime('%Y-%m-%d')}.log"
+            self.logs_dir, f"{datetime.now(timezone.utc).strftime('%Y-%m-%d')}{process_log_suffix(self.logs_dir)}.log"
         )
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.retention_days = retention_days
+        self.backup_count = backup_count
 
         self._configure_once()
 
@@ -36,7 +60,13 @@ class CustomLogger:
         stdout_handler.setLevel(self.level)
         stdout_handler.setFormatter(formatter)
 
-        file_handler = logging.FileHandler(self.log_file_path, encoding="utf-8")
+        file_handler = UtcRotatingFileHandler(
+            self.logs_dir,
+            max_bytes=self.max_bytes,
+            compression=self.compression,
+            retention_days=self.retention_days,
+            backup_count=self.backup_count,
+        )
         file_handler.setLevel(self.level)
         file_handler.setFormatter(formatter)
 
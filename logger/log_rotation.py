@@ -0,0 +1,294 @@
+"""Size/UTC-day log rotation with background compression and retention.
+
+Used by ``CustomLogger`` (stdlib ``logging`` handler) and ``ExceptionHandler``
+(Loguru rotation/compression callables) so both log streams share one policy.
+
+Rotation renames files, so each file must have exactly one writing process.
+The first process to lock ``<logs_dir>/.writer.lock`` writes the plain names
+(``<date>.log``, ``exceptions.log``); any other process (uvicorn workers,
+Streamlit, the watcher) writes ``<date>_<pid>.log`` / ``exceptions_<pid>.log``.
+"""
+
+import glob
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+try:
+    import zstandard
+except ImportError:  # Optional: fall back to gzip when zstd is not installed.
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:  # Not POSIX: every process uses its own pid-suffixed files.
+    fcntl = None
+
+
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_RETENTION_DAYS = 14
+DEFAULT_BACKUP_COUNT = 50
+DEFAULT_COMPRESSION = "gz"
+
+_COPY_CHUNK = 1024 * 1024
+
+# <date>[_<pid>][.<n>].log — active or size-rotated (uncompressed) main log files.
+_PLAIN_LOG_RE = re.compile(r"^(\d{4}-\d{2}-\d{2})(_\d+)?(\.\d+)?\.log$")
+
+# logs_dir -> suffix chosen for this process (the lock file stays open for life).
+_WRITER_SUFFIX: dict[str, str] = {}
+_WRITER_LOCKS: list = []
+_writer_lock = threading.Lock()
+
+
+def _utc_day() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+def process_log_suffix(logs_dir: str) -> str:
+    """Return ``""`` if this process owns ``logs_dir``'s plain log names, else ``"_<pid>"``."""
+    key = os.path.abspath(logs_dir)
+    with _writer_lock:
+        if key in _WRITER_SUFFIX:
+            return _WRITER_SUFFIX[key]
+        suffix = f"_{os.getpid()}"
+        if fcntl is not None:
+            os.makedirs(key, exist_ok=True)
+            handle = open(os.path.join(key, ".writer.lock"), "a")
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                _WRITER_LOCKS.append(handle)
+                suffix = ""
+            except OSError:
+                handle.close()
+        _WRITER_SUFFIX[key] = suffix
+        return suffix
+
+
+def resolve_codec(codec: str | None) -> str | None:
+    """Return the usable codec: ``"gz"``, ``"zst"`` or ``None`` (no compression)."""
+    if not codec:
+        return None
+    codec = codec.lower().lstrip(".")
+    if codec in ("zst", "zstd"):
+        return "zst" if zstandard is not None else "gz"
+    if codec in ("gz", "gzip"):
+        return "gz"
+    raise ValueError(f"Unsupported log compression: {codec}")
+
+
+def compress_file(path: str, codec: str | None) -> str:
+    """Compress ``path`` next to itself, remove the original and return the new path."""
+    codec = resolve_codec(codec)
+    if codec is None or not os.path.exists(path):
+        return path
+
+    target = f"{path}.{codec}"
+    tmp = f"{target}.tmp"
+    with open(path, "rb") as src:
+        if codec == "zst":
+            with open(tmp, "wb") as dst:
+                zstandard.ZstdCompressor(level=3).copy_stream(src, dst)
+        else:
+            with gzip.open(tmp, "wb", compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, _COPY_CHUNK)
+    os.replace(tmp, target)
+    os.remove(path)
+    return target
+
+
+def apply_retention(pattern: str, retention_days: int | None, backup_count: int | None, keep: str | None = None) -> None:
+    """Delete rotated archives matching ``pattern`` that are too old or too many.
+
+    ``keep`` is the active log file, which is never deleted even if it matches.
+    """
+    files = []
+    for path in glob.glob(pattern):
+        if keep and os.path.abspath(path) == os.path.abspath(keep):
+            continue
+        try:
+            files.append((os.path.getmtime(path), path))
+        except OSError:
+            continue
+    files.sort(reverse=True)
+
+    cutoff = time.time() - retention_days * 86400 if retention_days else None
+    for index, (mtime, path) in enumerate(files):
+        too_many = backup_count is not None and index >= backup_count
+        too_old = cutoff is not None and mtime < cutoff
+        if too_many or too_old:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class _ArchiveWorker:
+    """Single daemon thread that compresses rotated files off the logging path."""
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, path: str | None, codec: str | None, pattern: str, retention_days: int | None, backup_count: int | None, keep: str | None = None) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="log-archiver", daemon=True)
+                self._thread.start()
+        self._queue.put((path, codec, pattern, retention_days, backup_count, keep))
+
+    def join(self) -> None:
+        """Block until every queued archive job has finished."""
+        self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            path, codec, pattern, retention_days, backup_count, keep = self._queue.get()
+            try:
+                if path:
+                    compress_file(path, codec)
+                apply_retention(pattern, retention_days, backup_count, keep)
+            except Exception as error:  # Never let archiving kill the thread.
+                print(f"[log_rotation] Failed to archive {path}: {error}", file=sys.stderr)
+            finally:
+                self._queue.task_done()
+
+
+ARCHIVE_WORKER = _ArchiveWorker()
+
+
+class UtcRotatingFileHandler(logging.handlers.BaseRotatingHandler):
+    """Write to ``<logs_dir>/<YYYY-MM-DD>.log`` and roll over on UTC day change or size.
+
+    Size rollovers rename the active file to ``<date>.<n>.log``; day rollovers
+    keep the previous day's name. Either way the closed file is queued for
+    background compression and the retention policy is re-applied.
+    """
+
+    def __init__(
+        self,
+        logs_dir: str,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        compression: str | None = DEFAULT_COMPRESSION,
+        retention_days: int | None = DEFAULT_RETENTION_DAYS,
+        backup_count: int | None = DEFAULT_BACKUP_COUNT,
+        encoding: str = "utf-8",
+    ):
+        self.logs_dir = logs_dir
+        self.max_bytes = max_bytes
+        self.compression = resolve_codec(compression)
+        self.retention_days = retention_days
+        self.backup_count = backup_count
+        self.suffix = process_log_suffix(logs_dir)
+        self._day = _utc_day()
+        super().__init__(self._path_for(self._day), "a", encoding=encoding, delay=False)
+
+        # Compress plain files left behind by earlier runs, then prune archives.
+        for path in self._stale_plain_logs():
+            ARCHIVE_WORKER.submit(path, self.compression, self._archive_pattern, retention_days, backup_count, self.baseFilename)
+        ARCHIVE_WORKER.submit(None, None, self._archive_pattern, retention_days, backup_count, self.baseFilename)
+
+    def _stale_plain_logs(self) -> list[str]:
+        """Uncompressed logs no process can still be writing: earlier days, or size-rotated."""
+        if not self.compression:
+            return []
+        stale = []
+        for name in os.listdir(self.logs_dir):
+            match = _PLAIN_LOG_RE.match(name)
+            if match and (match.group(1) < self._day or match.group(3)):
+                stale.append(os.path.join(self.logs_dir, name))
+        return stale
+
+    @property
+    def _archive_pattern(self) -> str:
+        suffix = f".{self.compression}" if self.compression else ""
+        return os.path.join(self.logs_dir, f"????-??-??*.log{suffix}")
+
+    def _path_for(self, day: str) -> str:
+        return os.path.join(self.logs_dir, f"{day}{self.suffix}.log")
+
+    def _next_size_archive(self) -> str:
+        # Continue after the highest existing index so pruned slots are never reused.
+        stem = f"{self._day}{self.suffix}"
+        index = 0
+        for path in glob.glob(os.path.join(self.logs_dir, f"{stem}.*.log*")):
+            part = os.path.basename(path)[len(stem) + 1:].split(".")[0]
+            if part.isdigit():
+                index = max(index, int(part))
+        return os.path.join(self.logs_dir, f"{stem}.{index + 1}.log")
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if _utc_day() != self._day:
+            return True
+        if self.max_bytes > 0:
+            if self.stream is None:
+                self.stream = self._open()
+            message = f"{self.format(record)}\n"
+            if self.stream.tell() + len(message) >= self.max_bytes:
+                return True
+        return False
+
+    def doRollover(self) -> None:
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        closed = self.baseFilename
+        day = _utc_day()
+        if day == self._day and os.path.exists(closed):
+            archived = self._next_size_archive()
+            os.replace(closed, archived)
+        else:
+            archived = closed
+
+        self._day = day
+        self.baseFilename = self._path_for(day)
+        self.stream = self._open()
+
+        if os.path.exists(archived):
+            ARCHIVE_WORKER.submit(archived, self.compression, self._archive_pattern, self.retention_days, self.backup_count, self.baseFilename)
+
+
+class LoguruUtcRotation:
+    """Loguru ``rotation=`` callable: rotate on UTC day change or when ``max_bytes`` is hit."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._day: str | None = None
+
+    def __call__(self, message, file) -> bool:
+        day = message.record["time"].astimezone(timezone.utc).strftime("%Y-%m-%d")
+        if self._day is None:
+            self._day = day
+        if day != self._day:
+            self._day = day
+            return True
+        return self.max_bytes > 0 and file.tell() + len(message) > self.max_bytes
+
+
+class LoguruArchiver:
+    """Loguru ``compression=`` callable that hands the rotated file to the archive worker."""
+
+    def __init__(
+        self,
+        pattern: str,
+        compression: str | None = DEFAULT_COMPRESSION,
+        retention_days: int | None = DEFAULT_RETENTION_DAYS,
+        backup_count: int | None = DEFAULT_BACKUP_COUNT,
+    ):
+        self.pattern = pattern
+        self.compression = resolve_codec(compression)
+        self.retention_days = retention_days
+        self.backup_count = backup_count
+
+    def __call__(self, path: str) -> None:
+        ARCHIVE_WORKER.submit(path, self.compression, self.pattern, self.retention_days, self.backup_count)
@@ -20,6 +20,8 @@ class SummaryResponse(RootModel[list[ChangeFormat]]):
     pass
 class PromptType(str, Enum):
     DOCUMENT_ANALYSIS = "document_analysis"
+    DOCUMENT_ANALYSIS_CACHED = "document_analysis_cached"
     DOCUMENT_COMPARISON = "document_comparison"
     CONTEXTUALIZE_QUESTION = "contextualize_question"
-    CONTEXT_QA = "context_qa"
\ No newline at end of file
+    CONTEXT_QA = "context_qa"
+    SUMMARIZE_CHAT_HISTORY = "summarize_chat_history"
\ No newline at end of file
@@ -1,15 +1,59 @@
+import json
+from functools import lru_cache
+
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from pydantic import BaseModel
 
-# Prompt for document analysis
-document_analysis_prompt = ChatPromptTemplate.from_template("""
-You are a highly capable assistant trained to analyze and summarize documents.
+
+@lru_cache(maxsize=None)
+def compact_format_instructions(schema: type[BaseModel]) -> str:
+    """Return short, memoized JSON format instructions for a pydantic schema.
+
+    Same information as ``JsonOutputParser.get_format_instructions()`` but
+    without the long preamble, ``title`` noise and whitespace, and computed
+    once per schema so the prompt prefix is byte-identical across calls.
+    """
+    def strip_titles(node, is_properties=False):
+        if isinstance(node, dict):
+            return {
+                key: strip_titles(value, key == "properties")
+                for key, value in node.items()
+                if is_properties or key != "title"
+            }
+        if isinstance(node, list):
+            return [strip_titles(item) for item in node]
+        return node
+
+    schema_json = json.dumps(strip_titles(schema.model_json_schema()), separators=(",", ":"))
+    return f"The output must be a JSON object conforming to this JSON Schema:\n{schema_json}"
+
+
+# Static analysis instructions. Kept in the system message, ahead of the
+# document, so every call shares the same prefix. Providers only cache
+# prefixes of at least PROMPT_CACHE_MIN_TOKENS (Anthropic cache_control and
+# OpenAI automatic caching alike); shorter prefixes are simply not cached.
+DOCUMENT_ANALYSIS_INSTRUCTIONS = """You are a highly capable assistant trained to analyze and summarize documents.
 Return ONLY valid JSON matching the exact schema below.
 
-{format_instructions}
+{format_instructions}"""
 
-Analyze this document:
-{document_text}
-""")
+# With provider-native structured output the schema travels in the tool
+# definition, so the prompt only points at it instead of repeating it.
+STRUCTURED_OUTPUT_INSTRUCTIONS = "Schema: the one defined by the provided output tool."
+
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+# Prompt for document analysis
+document_analysis_prompt = ChatPromptTemplate.from_messages([
+    ("system", DOCUMENT_ANALYSIS_INSTRUCTIONS),
+    ("human", "Analyze this document:\n{document_text}"),
+])
+
+# Same prompt with an Anthropic cache breakpoint after the static prefix
+document_analysis_cached_prompt = ChatPromptTemplate.from_messages([
+    ("system", [{"type": "text", "text": DOCUMENT_ANALYSIS_INSTRUCTIONS, "cache_control": {"type": "ephemeral"}}]),
+    ("human", "Analyze this document:\n{document_text}"),
+])
 
 # Prompt for document comparison
 document_comparison_prompt = ChatPromptTemplate.from_template("""
@@ -51,10 +95,22 @@ context_qa_prompt = ChatPromptTemplate.from_messages([
     ("human", "{input}"),
 ])
 
+# Prompt for folding older chat turns into a running summary
+summarize_chat_history_prompt = ChatPromptTemplate.from_messages([
+    ("system", (
+        "You maintain a running summary of a conversation about a set of documents. Merge the existing summary "
+        "with the new conversation turns into one concise summary. Keep facts, names, numbers and open questions; "
+        "drop pleasantries. Respond with the summary text only, in no more than {max_words} words."
+    )),
+    ("human", "Existing summary:\n{summary}\n\nNew turns:\n{turns}"),
+])
+
 # Central dictionary to register prompts
 PROMPT_REGISTRY = {
     "document_analysis": document_analysis_prompt,
+    "document_analysis_cached": document_analysis_cached_prompt,
     "document_comparison": document_comparison_prompt,
     "contextualize_question": contextualize_question_prompt,
     "context_qa": context_qa_prompt,
+    "summarize_chat_history": summarize_chat_history_prompt,
 }
\ No newline at end of file
@@ -1,29 +1,67 @@
+import json
 import os
 import sys
 from utils.model_loader import ModelLoader
 from logger import GLOBAL_LOGGER as log
 from exception.custom_exception import DocumentPortalException
 from model.models import *
-from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.output_parsers import PydanticOutputParser
 from langchain.output_parsers import OutputFixingParser
-from prompt.prompt_library import PROMPT_REGISTRY # type: ignore
+from langchain_core.utils.json import parse_json_markdown
+from prompt.prompt_library import PROMPT_CACHE_MIN_TOKENS, PROMPT_REGISTRY, STRUCTURED_OUTPUT_INSTRUCTIONS, compact_format_instructions # type: ignore
+from utils.metrics import METRICS
+from utils.json_repair import repair_json, strip_fences
 
 
 class DocumentAnalyzer:
 	"""
 	Analyzes documents using a pre-trained model.
 	Automatically logs all actions and supports session-based organization.
+
+	Output is resolved in tiers, cheapest first, and each tier is counted in
+	METRICS (`analyzer_parse_tier_total`):
+	  structured   -> provider-native structured output (tool calling / JSON mode)
+	  direct       -> model text parsed as-is
+	  local_repair -> model text fixed locally (fences, trailing commas, truncation)
+	  llm_fix      -> OutputFixingParser, i.e. a second LLM call
 	"""
-	def __init__(self):
+	def __init__(self, llm=None, structured_output: bool = True):
+		"""
+		Pass `llm` to use an already-built chat model (e.g. a fake for benchmarks);
+		otherwise the model is loaded from config via ModelLoader.
+		Set `structured_output=False` to skip the provider-native structured path.
+		"""
 		try:
-			self.loader=ModelLoader()
-			self.llm=self.loader.load_llm()
+			if llm is None:
+				self.loader=ModelLoader()
+				self.llm=self.loader.load_llm()
+			else:
+				self.loader=None
+				self.llm=llm
 
 			# Prepare parsers
-			self.parser = JsonOutputParser(pydantic_object=Metadata)
+			# Validating parser: schema violations (e.g. missing fields) trigger the LLM fix.
+			self.parser = PydanticOutputParser(pydantic_object=Metadata)
 			self.fixing_parser = OutputFixingParser.from_llm(parser=self.parser, llm=self.llm)
-
-			self.prompt = PROMPT_REGISTRY["document_analysis"]
+			self.structured_llm = self._build_structured_llm() if structured_output else None
+
+			# Format instructions are memoized per schema and baked into the static
+			# system prefix. In structured mode the tool definition already carries
+			# the schema, so it is not repeated in the prompt.
+			schema = compact_format_instructions(Metadata)
+			self.format_instructions = STRUCTURED_OUTPUT_INSTRUCTIONS if self.structured_llm is not None else schema
+			# Cache breakpoints below the provider minimum are ignored, so only mark
+			# the prefix (tools + system, roughly 4 chars/token) when it qualifies.
+			prefix_chars = len(PROMPT_REGISTRY["document_analysis"].messages[0].prompt.template) + len(self.format_instructions)
+			if self.structured_llm is not None:
+				prefix_chars += len(schema)
+			self.prefix_tokens_estimate = prefix_chars // 4
+			cacheable = self._supports_cache_control() and self.prefix_tokens_estimate >= PROMPT_CACHE_MIN_TOKENS
+			prompt_key = "document_analysis_cached" if cacheable else "document_analysis"
+			self.prompt = PROMPT_REGISTRY[prompt_key].partial(format_instructions=self.format_instructions)
+			# Streaming needs the model to write the JSON as text, schema included.
+			self.stream_prompt = PROMPT_REGISTRY["document_analysis"].partial(format_instructions=schema)
+			log.info("Analysis prompt prepared", prompt=prompt_key, prefix_tokens_estimate=self.prefix_tokens_estimate, cache_min_tokens=PROMPT_CACHE_MIN_TOKENS)
 
 			log.info("DocumentAnalyzer initialized successfully")
 
@@ -34,21 +72,49 @@ class DocumentAnalyzer:
 
 
 
+	def _supports_cache_control(self) -> bool:
+		"""Only Anthropic needs explicit cache_control blocks; others cache prefixes automatically."""
+		return getattr(self.llm, "_llm_type", "") == "anthropic-chat"
+
+	def _build_structured_llm(self):
+		"""Return the LLM bound to the Metadata schema, or None if the provider can't do it."""
+		try:
+			return self.llm.with_structured_output(Metadata, include_raw=True)
+		except (NotImplementedError, AttributeError, ValueError) as e:
+			log.info("Structured output unavailable, using text parsing", error=str(e))
+			return None
+
+	@METRICS.timed("analyzer_analyze_document")
 	def analyze_document(self, document_text:str)-> dict:
 		"""
 		Analyze a document's text and extract structured metadata & summary.
+		LLM latency, parsing/fixing latency and token usage are recorded in METRICS.
 		"""
 		try:
-			chain = self.prompt | self.llm | self.fixing_parser
+			inputs = {"document_text": document_text}
+
+			log.info("Meta-data analysis chain initialized", structured=self.structured_llm is not None)
+
+			if self.structured_llm is not None:
+				with METRICS.timed("analyzer_llm", mode="structured"):
+					result = (self.prompt | self.structured_llm).invoke(inputs)
+				message = result["raw"]
+				self._record_token_usage(message)
 
-			log.info("Meta-data analysis chain initialized")
+				if result.get("parsed") is not None:
+					self._record_tier("structured")
+					response = result["parsed"].model_dump()
+					log.info("Metadata extraction successful", keys=list(response.keys()), tier="structured")
+					return response
+			else:
+				with METRICS.timed("analyzer_llm", mode="text"):
+					message = (self.prompt | self.llm).invoke(inputs)
+				self._record_token_usage(message)
 
-			response = chain.invoke({
-				"format_instructions": self.parser.get_format_instructions(),
-				"document_text": document_text
-			})
+			with METRICS.timed("analyzer_parse"):
+				response, tier = self._parse_with_fallbacks(self._message_text(message))
 
-			log.info("Metadata extraction successful", keys=list(response.keys()))
+			log.info("Metadata extraction successful", keys=list(response.keys()), tier=tier)
 
 			return response
 
@@ -56,3 +122,97 @@ class DocumentAnalyzer:
 			log.error("Metadata analysis failed", error=str(e))
 			raise DocumentPortalException("Metadata extraction failed", e)
 
+	def stream_analysis(self, document_text: str):
+		"""
+		Yield partial metadata dicts while the model streams its JSON, then the
+		final result (parsed through the same fallback tiers as analyze_document).
+		If streaming fails, the last item comes from analyze_document instead.
+		"""
+		inputs = {"document_text": document_text}
+		message = None
+		try:
+			with METRICS.timed("analyzer_llm", mode="stream"):
+				for chunk in (self.stream_prompt | self.llm).stream(inputs):
+					message = chunk if message is None else message + chunk
+					try:
+						partial = parse_json_markdown(self._message_text(message))
+					except Exception:
+						continue
+					if isinstance(partial, dict) and partial:
+						yield partial
+			if message is None:
+				raise ValueError("Model returned an empty stream")
+			self._record_token_usage(message)
+			with METRICS.timed("analyzer_parse"):
+				response, tier = self._parse_with_fallbacks(self._message_text(message))
+		except Exception as e:
+			log.info("Streaming analysis failed, using analyze_document", error=str(e))
+			yield self.analyze_document(document_text)
+			return
+
+		log.info("Metadata extraction successful", keys=list(response.keys()), tier=tier, streamed=True)
+		yield response
+
+	def _parse_with_fallbacks(self, text: str) -> tuple[dict, str]:
+		"""Parse model text: as-is, then local repair, and only then an LLM fixing call.
+
+		The first two tiers are strict (``json.loads`` + schema validation), so
+		truncated or incomplete output is never accepted as a direct parse.
+		"""
+		try:
+			response = self._validate(json.loads(strip_fences(text.strip())))
+			tier = "direct"
+		except ValueError:
+			try:
+				response = self._validate(json.loads(repair_json(text)))
+				tier = "local_repair"
+			except ValueError:
+				response = self.fixing_parser.parse(text).model_dump()
+				tier = "llm_fix"
+		self._record_tier(tier)
+		return response, tier
+
+	@staticmethod
+	def _validate(data) -> dict:
+		"""Return ``data`` checked against the Metadata schema (raises ValueError)."""
+		return Metadata.model_validate(data).model_dump()
+
+	@staticmethod
+	def _message_text(message) -> str:
+		"""Return the JSON-bearing text of an AI message (tool-call args or content)."""
+		tool_calls = getattr(message, "tool_calls", None)
+		if tool_calls:
+			return json.dumps(tool_calls[0].get("args", {}))
+		content = message.content
+		if isinstance(content, list):
+			return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+		return content
+
+	@staticmethod
+	def _record_tier(tier: str) -> None:
+		METRICS.incr("analyzer_parse_tier_total", tier=tier)
+
+	@staticmethod
+	def _record_token_usage(message) -> None:
+		"""Add the LLM call's token usage (if the provider reports it) to METRICS and log it."""
+		usage = getattr(message, "usage_metadata", None) or {}
+		details = usage.get("input_token_details") or {}
+		input_tokens = usage.get("input_tokens", 0)
+		cached_tokens = details.get("cache_read", 0) or 0
+		cache_write_tokens = details.get("cache_creation", 0) or 0
+		output_tokens = usage.get("output_tokens", 0)
+
+		METRICS.incr("llm_calls_total", stage="analysis")
+		METRICS.incr("llm_input_tokens_total", input_tokens, stage="analysis")
+		METRICS.incr("llm_cached_input_tokens_total", cached_tokens, stage="analysis")
+		METRICS.incr("llm_cache_write_tokens_total", cache_write_tokens, stage="analysis")
+		METRICS.incr("llm_output_tokens_total", output_tokens, stage="analysis")
+
+		log.info(
+			"LLM token usage",
+			input_tokens=input_tokens,
+			cached_input_tokens=cached_tokens,
+			uncached_input_tokens=max(0, input_tokens - cached_tokens),
+			cache_write_tokens=cache_write_tokens,
+			output_tokens=output_tokens,
+		)
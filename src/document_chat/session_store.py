@@ -0,0 +1,343 @@
+"""Bounded chat-history store keyed by ingestion ``session_id``.
+
+Memory stays flat regardless of user count:
+- messages are stored compactly as ``(role, text)`` tuples, not message objects;
+- sessions are evicted LRU beyond ``max_sessions`` and expire after ``ttl_seconds``;
+- each session's history is capped at ``max_history_tokens``; older turns are
+  folded into a running summary (LLM-based or a cheap extractive default);
+- optionally, LRU-evicted sessions spill to SQLite and are reloaded on access.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable
+import json
+import sqlite3
+import threading
+import time
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from exception.custom_exception import DocumentPortalException
+from logger.custom_logger import CustomLogger
+from utils.metrics import METRICS
+
+
+log = CustomLogger().get_logger(__file__)
+
+HUMAN = "h"
+AI = "a"
+_MESSAGE_TYPES = {HUMAN: HumanMessage, AI: AIMessage}
+_ROLE_ALIASES = {"human": HUMAN, "user": HUMAN, HUMAN: HUMAN, "ai": AI, "assistant": AI, AI: AI}
+
+# Summarizer signature: (previous_summary, folded (role, text) turns) -> new summary
+Summarizer = Callable[[str, list[tuple[str, str]]], str]
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 chars per token plus per-message overhead)."""
+    return len(text) // 4 + 4
+
+
+def _format_turns(turns: list[tuple[str, str]]) -> str:
+    return "\n".join(f"{'User' if role == HUMAN else 'Assistant'}: {text}" for role, text in turns)
+
+
+def extractive_summarizer(max_chars: int = 2000) -> Summarizer:
+    """Return an LLM-free summarizer that keeps the most recent ``max_chars`` of history."""
+    def summarize(summary: str, turns: list[tuple[str, str]]) -> str:
+        merged = f"{summary}\n{_format_turns(turns)}".strip()
+        return merged[-max_chars:]
+
+    return summarize
+
+
+def llm_summarizer(llm: Any, max_words: int = 200) -> Summarizer:
+    """Return a summarizer that merges turns into the summary with ``llm``."""
+    from prompt.prompt_library import PROMPT_REGISTRY
+
+    chain = PROMPT_REGISTRY["summarize_chat_history"] | llm
+
+    def summarize(summary: str, turns: list[tuple[str, str]]) -> str:
+        with METRICS.timed("chat_summarize_llm"):
+            message = chain.invoke({"summary": summary or "(none)", "turns": _format_turns(turns), "max_words": max_words})
+        return str(message.content).strip()
+
+    return summarize
+
+
+class _Session:
+    """Compact per-session state."""
+
+    __slots__ = ("summary", "turns", "tokens", "last_access")
+
+    def __init__(self, summary: str = "", turns: list[tuple[str, str]] | None = None, last_access: float | None = None):
+        self.summary = summary
+        self.turns = turns or []
+        self.tokens = estimate_tokens(summary) if summary else 0
+        self.tokens += sum(estimate_tokens(text) for _, text in self.turns)
+        self.last_access = last_access if last_access is not None else time.monotonic()
+
+    def to_json(self) -> str:
+        return json.dumps({"summary": self.summary, "turns": self.turns}, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, payload: str) -> "_Session":
+        data = json.loads(payload)
+        return cls(data.get("summary", ""), [tuple(t) for t in data.get("turns", [])])
+
+
+class SQLiteSpill:
+    """Disk backend for sessions evicted from memory."""
+
+    def __init__(self, path: str | Path):
+        path = Path(path)
+        if not path.is_absolute():
+            path = Path.cwd() / path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        # Access is serialized by the owning store's lock.
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS chat_sessions (session_id TEXT PRIMARY KEY, payload TEXT NOT NULL, updated_at REAL NOT NULL)")
+
+    def put(self, session_id: str, session: _Session) -> None:
+        self._conn.execute(
+            "INSERT INTO chat_sessions (session_id, payload, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET payload = excluded.payload, updated_at = excluded.updated_at",
+            (session_id, session.to_json(), time.time()),
+        )
+
+    def pop(self, session_id: str, ttl_seconds: float | None) -> _Session | None:
+        row = self._conn.execute("SELECT payload, updated_at FROM chat_sessions WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None
+        self._conn.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
+        payload, updated_at = row
+        if ttl_seconds and time.time() - updated_at > ttl_seconds:
+            return None
+        return _Session.from_json(payload)
+
+    def delete(self, session_id: str) -> None:
+        self._conn.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
+
+    def prune(self, ttl_seconds: float | None) -> int:
+        if not ttl_seconds:
+            return 0
+        cursor = self._conn.execute("DELETE FROM chat_sessions WHERE updated_at < ?", (time.time() - ttl_seconds,))
+        return cursor.rowcount
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class ChatSessionStore:
+    """Thread-safe, bounded chat history keyed by ingestion ``session_id``."""
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        ttl_seconds: float | None = 3600,
+        max_history_tokens: int = 2000,
+        keep_recent_messages: int = 6,
+        summarizer: Summarizer | None = None,
+        sqlite_path: str | Path | None = None,
+    ):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_history_tokens = max_history_tokens
+        self.keep_recent_messages = keep_recent_messages
+        self.summarizer = summarizer or extractive_summarizer(max_chars=max_history_tokens * 2)
+        self.spill = SQLiteSpill(sqlite_path) if sqlite_path else None
+
+        self._sessions: OrderedDict[str, _Session] = OrderedDict()
+        # Sessions whose oldest turns are being summarized (one fold at a time each).
+        self._folding: set[str] = set()
+        self._lock = threading.Lock()
+        self._ops = 0
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any], summarizer: Summarizer | None = None) -> "ChatSessionStore":
+        """Build a store from the ``chat_sessions`` section of config.yaml."""
+        settings = config.get("chat_sessions", {}) or {}
+        return cls(
+            max_sessions=settings.get("max_sessions", 1000),
+            ttl_seconds=settings.get("ttl_seconds", 3600),
+            max_history_tokens=settings.get("max_history_tokens", 2000),
+            keep_recent_messages=settings.get("keep_recent_messages", 6),
+            summarizer=summarizer,
+            sqlite_path=settings.get("sqlite_path"),
+        )
+
+    # ── public API ────────────────────────────────────────────────────────
+
+    def add_message(self, session_id: str, role: str, content: str) -> None:
+        """Append one message (``role`` is human/user or ai/assistant)."""
+        code = _ROLE_ALIASES.get(role.lower())
+        if code is None:
+            raise DocumentPortalException(f"Unsupported chat role: {role}", ValueError(role))
+
+        with self._lock:
+            session = self._get_or_create(session_id)
+            session.turns.append((code, content))
+            session.tokens += estimate_tokens(content)
+            folded = [] if session_id in self._folding else self._plan_fold(session)
+            if folded:
+                self._folding.add(session_id)
+            self._maybe_prune()
+
+        if folded:
+            self._summarize(session_id, folded)
+
+    def add_turn(self, session_id: str, question: str, answer: str) -> None:
+        """Append a user question and the assistant's answer."""
+        self.add_message(session_id, HUMAN, question)
+        self.add_message(session_id, AI, answer)
+
+    def get_history(self, session_id: str) -> list[BaseMessage]:
+        """Return history as LangChain messages for a ``chat_history`` placeholder."""
+        with self._lock:
+            session = self._get(session_id)
+            if session is None:
+                return []
+            summary, turns = session.summary, list(session.turns)
+
+        messages: list[BaseMessage] = []
+        if summary:
+            messages.append(SystemMessage(content=f"Summary of earlier conversation:\n{summary}"))
+        messages.extend(_MESSAGE_TYPES[role](content=text) for role, text in turns)
+        return messages
+
+    def clear(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            if self.spill is not None:
+                self.spill.delete(session_id)
+
+    def prune_expired(self) -> int:
+        """Drop idle sessions (memory and disk). Returns the number removed from memory."""
+        with self._lock:
+            return self._prune_locked()
+
+    def close(self) -> None:
+        """Spill in-memory sessions to disk (if configured) and release the database."""
+        with self._lock:
+            if self.spill is not None:
+                for session_id, session in self._sessions.items():
+                    self.spill.put(session_id, session)
+                self.spill.close()
+                self.spill = None
+            self._sessions.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._sessions
+
+    # ── internals (call with self._lock held) ─────────────────────────────
+
+    def _expired(self, session: _Session, now: float) -> bool:
+        return bool(self.ttl_seconds) and now - session.last_access > self.ttl_seconds
+
+    def _get(self, session_id: str) -> _Session | None:
+        now = time.monotonic()
+        session = self._sessions.get(session_id)
+        if session is not None and self._expired(session, now):
+            del self._sessions[session_id]
+            METRICS.incr("chat_sessions_evicted_total", reason="ttl")
+            session = None
+        if session is None and self.spill is not None:
+            session = self.spill.pop(session_id, self.ttl_seconds)
+            if session is not None:
+                METRICS.incr("chat_sessions_restored_total")
+                self._sessions[session_id] = session
+                self._evict_lru()
+        if session is not None:
+            session.last_access = now
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def _get_or_create(self, session_id: str) -> _Session:
+        session = self._get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = _Session()
+            self._evict_lru()
+        return session
+
+    def _evict_lru(self) -> None:
+        while len(self._sessions) > self.max_sessions:
+            session_id, session = self._sessions.popitem(last=False)
+            if self.spill is not None:
+                self.spill.put(session_id, session)
+                METRICS.incr("chat_sessions_evicted_total", reason="spill")
+            else:
+                METRICS.incr("chat_sessions_evicted_total", reason="lru")
+
+    def _plan_fold(self, session: _Session) -> list[tuple[str, str]]:
+        """Return the oldest turns to fold so the session fits the token cap.
+
+        The turns stay in the session (and in ``get_history``) until their
+        summary is written back by ``_summarize``.
+        """
+        if session.tokens <= self.max_history_tokens:
+            return []
+        # Fold down to half the cap so summarization doesn't fire on every message.
+        target = self.max_history_tokens // 2
+        tokens = session.tokens
+        count = 0
+        while tokens > target and len(session.turns) - count > self.keep_recent_messages:
+            tokens -= estimate_tokens(session.turns[count][1])
+            count += 1
+        return session.turns[:count]
+
+    def _summarize(self, session_id: str, folded: list[tuple[str, str]]) -> None:
+        """Merge folded turns into the summary, then drop them. Runs outside the lock (may call an LLM)."""
+        try:
+            with self._lock:
+                session = self._sessions.get(session_id)
+                previous = session.summary if session is not None else ""
+
+            try:
+                summary = self.summarizer(previous, folded)
+            except Exception as e:
+                # Keep the conversation usable: fall back to the cheap extractive summary.
+                log.error("Chat history summarization failed", session_id=session_id, error=str(e))
+                summary = extractive_summarizer(self.max_history_tokens * 2)(previous, folded)
+            METRICS.incr("chat_history_summaries_total")
+
+            with self._lock:
+                # Re-fetch: the session may have been spilled to disk during the call;
+                # _get restores it so the folded turns are replaced, not lost.
+                session = self._get(session_id)
+                if session is None or session.summary != previous or session.turns[: len(folded)] != folded:
+                    return  # cleared or replaced meanwhile
+                del session.turns[: len(folded)]
+                session.tokens -= sum(estimate_tokens(text) for _, text in folded)
+                if session.summary:
+                    session.tokens -= estimate_tokens(session.summary)
+                session.summary = summary
+                session.tokens += estimate_tokens(summary)
+        finally:
+            with self._lock:
+                self._folding.discard(session_id)
+
+    def _maybe_prune(self) -> None:
+        self._ops += 1
+        if self._ops % 1000 == 0:
+            self._prune_locked()
+
+    def _prune_locked(self) -> int:
+        now = time.monotonic()
+        expired = [sid for sid, s in self._sessions.items() if self._expired(s, now)]
+        for session_id in expired:
+            del self._sessions[session_id]
+        if expired:
+            METRICS.incr("chat_sessions_evicted_total", len(expired), reason="ttl")
+        if self.spill is not None:
+            self.spill.prune(self.ttl_seconds)
+        return len(expired)
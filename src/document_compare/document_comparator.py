@@ -1,5 +1,30 @@
 """Simple document comparison utilities."""
 
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+import glob
+
+import numpy as np
+
+from logger.custom_logger import CustomLogger
+from utils.metrics import METRICS
+from src.document_compare.page_signatures import (
+    NUM_PERM,
+    SIGNATURES_SIDECAR_SUFFIX,
+    compute_page_signatures,
+    load_page_signatures,
+)
+
+
+log = CustomLogger().get_logger(__file__)
+
+# Estimated Jaccard similarity at which two pages count as the same page, edited.
+MATCH_THRESHOLD = 0.3
+# Cap on the (new pages x archived pages x permutations) comparison block.
+_BLOCK_ELEMENTS = 32 * 1024 * 1024
+
 
 def compare_documents(text_a: str, text_b: str) -> dict:
     """Compare two documents by basic size metrics."""
@@ -8,3 +33,121 @@ def compare_documents(text_a: str, text_b: str) -> dict:
         "doc_b_chars": len(text_b),
         "same_length": len(text_a) == len(text_b),
     }
+
+
+def find_archived_signatures(data_dir: str | Path, file_name: str | None = None) -> list[Path]:
+    """Return signature sidecars under ``<data_dir>/sessions`` (optionally for one file name)."""
+    pattern = f"*/{glob.escape(file_name)}{SIGNATURES_SIDECAR_SUFFIX}" if file_name else f"*/*{SIGNATURES_SIDECAR_SUFFIX}"
+    return sorted((Path(data_dir) / "sessions").glob(pattern))
+
+
+def _similarity_matrix(new: np.ndarray, archived: np.ndarray) -> np.ndarray:
+    """Estimated Jaccard of every new page vs every archived page (MinHash agreement)."""
+    sims = np.empty((new.shape[0], archived.shape[0]), dtype=np.float32)
+    step = max(1, _BLOCK_ELEMENTS // max(1, new.shape[0] * new.shape[1]))
+    for start in range(0, archived.shape[0], step):
+        block = archived[start:start + step]
+        sims[:, start:start + step] = (new[:, None, :] == block[None, :, :]).mean(axis=2)
+    return sims
+
+
+def _change_map(new_pages: list[dict], old_pages: list[dict], sims: np.ndarray, threshold: float) -> tuple[list[dict], dict[str, int], float]:
+    """Per-page changes of ``new_pages`` relative to one archived version."""
+    counts = {"unchanged": 0, "modified": 0, "added": 0, "removed": 0}
+    changes: list[dict] = []
+    old_hashes = {p["hash"]: j for j, p in reversed(list(enumerate(old_pages)))}
+    best_old = sims.argmax(axis=1) if old_pages else np.zeros(len(new_pages), dtype=int)
+    best_new_sim = sims.max(axis=1) if old_pages else np.zeros(len(new_pages))
+    matched_old: set[int] = set()
+
+    for i, page in enumerate(new_pages):
+        j = old_hashes.get(page["hash"])
+        if j is not None:
+            status, similarity = "unchanged", 1.0
+        elif old_pages and best_new_sim[i] >= threshold:
+            j, status, similarity = int(best_old[i]), "modified", float(best_new_sim[i])
+        else:
+            status, similarity = "added", float(best_new_sim[i]) if old_pages else 0.0
+        entry = {"page": i, "status": status, "matched_page": j, "similarity": round(similarity, 4)}
+        if j is not None:
+            matched_old.add(j)
+            entry["char_delta"] = page["chars"] - old_pages[j]["chars"]
+        counts[status] += 1
+        changes.append(entry)
+
+    best_old_sim = sims.max(axis=0) if new_pages else np.zeros(len(old_pages))
+    for j, page in enumerate(old_pages):
+        if j not in matched_old and best_old_sim[j] < threshold:
+            changes.append({"page": None, "status": "removed", "matched_page": j, "similarity": round(float(best_old_sim[j]), 4), "char_delta": -page["chars"]})
+            counts["removed"] += 1
+
+    # Symmetric score: how well each side's pages are covered by the other's.
+    total = len(new_pages) + len(old_pages)
+    score = float((best_new_sim.sum() + best_old_sim.sum()) / total) if total else 1.0
+    return changes, counts, score
+
+
+def compare_against_archive(
+    pages: list[str] | list[dict[str, Any]],
+    data_dir: str | Path = "data/document_analyzer",
+    file_name: str | None = None,
+    exclude_session_id: str | None = None,
+    threshold: float = MATCH_THRESHOLD,
+    top_k: int | None = None,
+) -> dict[str, Any]:
+    """Compare one document against every archived version in ``sessions/``.
+
+    ``pages`` is the document's page texts (or precomputed page signatures).
+    Archived versions are read from their ``.signatures.json`` sidecars written
+    at ingestion time; no archived file is reparsed. Versions without a
+    sidecar are skipped and counted in ``missing_signatures``.
+
+    Returns
+    -------
+    dict
+        ``ranking``: versions sorted by similarity (highest first);
+        ``change_maps``: session_id -> per-page changes (``unchanged``,
+        ``modified``, ``added``, ``removed``) relative to that version.
+    """
+    new_pages = pages if pages and isinstance(pages[0], dict) else compute_page_signatures(pages)
+    sidecars = find_archived_signatures(data_dir, file_name)
+
+    versions: list[tuple[str, str, list[dict]]] = []
+    for path in sidecars:
+        session_id = path.parent.name
+        if session_id == exclude_session_id:
+            continue
+        payload = load_page_signatures(path)
+        versions.append((session_id, payload.get("file_name", path.name[: -len(SIGNATURES_SIDECAR_SUFFIX)]), payload["pages"]))
+
+    missing = 0
+    if file_name:
+        sessions_root = Path(data_dir) / "sessions"
+        missing = sum(1 for f in sessions_root.glob(f"*/{glob.escape(file_name)}") if not f.with_name(f.name + SIGNATURES_SIDECAR_SUFFIX).exists())
+
+    ranking: list[dict[str, Any]] = []
+    change_maps: dict[str, list[dict]] = {}
+    with METRICS.timed("compare_batch"):
+        if versions:
+            # One pass: stack every archived page into a single matrix.
+            # Explicit widths: a document with zero pages (e.g. whitespace-only TXT) is still valid.
+            new_matrix = np.asarray([p["minhash"] for p in new_pages], dtype=np.uint64).reshape(len(new_pages), NUM_PERM)
+            old_rows = [p["minhash"] for _, _, vp in versions for p in vp]
+            old_matrix = np.asarray(old_rows, dtype=np.uint64).reshape(len(old_rows), NUM_PERM)
+            sims = _similarity_matrix(new_matrix, old_matrix)
+            offset = 0
+            for session_id, name, old_pages in versions:
+                block = sims[:, offset:offset + len(old_pages)]
+                offset += len(old_pages)
+                changes, counts, score = _change_map(new_pages, old_pages, block, threshold)
+                change_maps[session_id] = changes
+                ranking.append({"session_id": session_id, "file_name": name, "similarity": round(score, 4), "pages": len(old_pages), **counts})
+
+    ranking.sort(key=lambda r: (-r["similarity"], r["session_id"]))
+    if top_k is not None:
+        ranking = ranking[:top_k]
+        change_maps = {r["session_id"]: change_maps[r["session_id"]] for r in ranking}
+    METRICS.incr("compare_versions_total", len(versions))
+
+    log.info("Batch comparison completed", file_name=file_name, pages=len(new_pages), versions=len(versions), missing_signatures=missing)
+    return {"pages": len(new_pages), "versions_compared": len(versions), "missing_signatures": missing, "ranking": ranking, "change_maps": change_maps}
@@ -0,0 +1,108 @@
+"""Per-page document signatures for fast cross-version comparison.
+
+A page signature holds:
+- ``hash``: SHA-1 of the normalized text (exact-match detection);
+- ``minhash``: MinHash of word 5-shingles (Jaccard similarity estimate);
+- length stats: ``chars``, ``words``, ``lines``.
+
+Signatures are written at ingestion time next to the archived file as
+``<session_file>.signatures.json`` so comparisons never reparse a document.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+import hashlib
+import json
+import re
+import threading
+import zlib
+
+import numpy as np
+
+
+SIGNATURES_SIDECAR_SUFFIX = ".signatures.json"
+SHINGLE_WORDS = 5
+NUM_PERM = 64
+# Sidecars kept in memory by load_page_signatures (least recently used dropped first).
+MAX_LOADED_SIGNATURES = 256
+
+# Fixed MinHash permutations h(x) = (a*x + b) mod p over 32-bit shingle hashes.
+# a, b < 2**32 and x < 2**32 keep a*x + b below 2**64, so uint64 never overflows.
+_PRIME = np.uint64(4294967311)
+_rng = np.random.default_rng(20240601)
+_PERM_A = _rng.integers(1, 2**32, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 2**32, size=NUM_PERM, dtype=np.uint64)
+_EMPTY = np.full(NUM_PERM, int(_PRIME), dtype=np.uint64)
+
+_WS_RE = re.compile(r"\s+")
+_PUNCT_RE = re.compile(r"[^\w\s]")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return _WS_RE.sub(" ", _PUNCT_RE.sub(" ", text.lower())).strip()
+
+
+def _minhash(words: list[str]) -> np.ndarray:
+    if not words:
+        return _EMPTY.copy()
+    k = min(SHINGLE_WORDS, len(words))
+    shingles = {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+    x = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    return ((x[:, None] * _PERM_A[None, :] + _PERM_B[None, :]) % _PRIME).min(axis=0)
+
+
+def page_signature(text: str) -> dict[str, Any]:
+    """Return the signature of one page's text."""
+    normalized = normalize_text(text)
+    words = normalized.split()
+    return {
+        "hash": hashlib.sha1(normalized.encode("utf-8")).hexdigest(),
+        "chars": len(text),
+        "words": len(words),
+        "lines": text.count("\n") + 1 if text else 0,
+        "minhash": _minhash(words).tolist(),
+    }
+
+
+def compute_page_signatures(pages: list[str]) -> list[dict[str, Any]]:
+    return [page_signature(text) for text in pages]
+
+
+def signatures_path(session_file: str | Path) -> Path:
+    session_file = Path(session_file)
+    return session_file.with_name(session_file.name + SIGNATURES_SIDECAR_SUFFIX)
+
+
+def write_page_signatures(session_file: str | Path, pages: list[str]) -> Path:
+    """Compute and persist page signatures for an archived file."""
+    path = signatures_path(session_file)
+    payload = {"file_name": Path(session_file).name, "shingle_words": SHINGLE_WORDS, "num_perm": NUM_PERM, "pages": compute_page_signatures(pages)}
+    path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+    return path
+
+
+# path -> (mtime_ns, payload), least recently used first.
+_LOADED: OrderedDict[Path, tuple[int, dict[str, Any]]] = OrderedDict()
+_LOADED_LOCK = threading.Lock()
+
+
+def load_page_signatures(path: str | Path) -> dict[str, Any]:
+    """Load a signatures sidecar (LRU-memoized by path + mtime, ``MAX_LOADED_SIGNATURES`` entries)."""
+    path = Path(path)
+    mtime = path.stat().st_mtime_ns
+    with _LOADED_LOCK:
+        cached = _LOADED.get(path)
+        if cached is not None and cached[0] == mtime:
+            _LOADED.move_to_end(path)
+            return cached[1]
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    with _LOADED_LOCK:
+        _LOADED[path] = (mtime, payload)
+        _LOADED.move_to_end(path)
+        while len(_LOADED) > MAX_LOADED_SIGNATURES:
+            _LOADED.popitem(last=False)
+    return payload
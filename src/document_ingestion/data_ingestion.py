@@ -1,23 +1,46 @@
-"""Load PDFs from a directory into LangChain Documents."""
+"""Load documents (PDF, DOCX, TXT, Markdown) from a directory into LangChain Documents."""
 
 from __future__ import annotations
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Iterable, Iterator
+import glob
 import hashlib
+import os
 import re
 import shutil
 import uuid
 
-from langchain_community.document_loaders import PyPDFLoader
 from langchain_core.documents import Document
 
-from exception.custom_exception import DocumentPortalException
+from exception.custom_exception import DocumentPortalException, report_exception
 from logger.custom_logger import CustomLogger
+from utils.metrics import METRICS
+from src.document_ingestion.extractors import get_extractor, supported_extensions
+from src.document_compare.page_signatures import signatures_path, write_page_signatures
 
 
 log = CustomLogger().get_logger(__file__)
 
+HASH_CHUNK_BYTES = 1024 * 1024
+
+# Files up to this size are read once into memory and parsed from the bytes;
+# larger ones are hashed while being copied into the session folder.
+INMEMORY_MAX_BYTES = 256 * 1024 * 1024
+
+# Threads used to read + hash files ahead of parsing (hashlib releases the GIL).
+HASH_WORKERS = min(8, (os.cpu_count() or 1) + 4)
+
+# Total bytes of file contents held in memory by read-ahead (including the
+# file being parsed). One file is always admitted, so the peak is at most
+# max(PREFETCH_MAX_BYTES, INMEMORY_MAX_BYTES).
+PREFETCH_MAX_BYTES = 512 * 1024 * 1024
+
+SHA256_SIDECAR_SUFFIX = ".sha256"
+
 
 def _safe_name(name: str) -> str:
     """Make a filesystem-safe, lowercase name fragment."""
@@ -37,17 +60,68 @@ def create_pdf_session_id(pdf_path: Path) -> str:
     return f"{ts}__{stem}__{uid}"
 
 
+@METRICS.timed("ingestion_sha256")
 def _file_sha256(path: Path) -> str:
     """Return SHA-256 hash for a file."""
     h = hashlib.sha256()
+    size = 0
     with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            h.update(chunk)
+            size += len(chunk)
+    METRICS.incr("ingestion_hashed_bytes_total", size)
+    return h.hexdigest()
+
+
+@METRICS.timed("ingestion_read")
+def read_and_hash(path: Path) -> tuple[bytes | None, str | None]:
+    """Read a file once and hash the bytes in memory.
+
+    Returns ``(None, None)`` for files above ``INMEMORY_MAX_BYTES``; those are
+    hashed while copied in ``create_session_artifacts`` instead.
+    """
+    if path.stat().st_size > INMEMORY_MAX_BYTES:
+        return None, None
+    data = path.read_bytes()
+    METRICS.incr("ingestion_hashed_bytes_total", len(data))
+    return data, hashlib.sha256(data).hexdigest()
+
+
+def _copy_and_hash(src: Path, dst: Path) -> str:
+    """Copy ``src`` to ``dst`` in one pass, hashing the chunks as they stream through."""
+    h = hashlib.sha256()
+    size = 0
+    with src.open("rb") as fin, dst.open("wb") as fout:
+        for chunk in iter(lambda: fin.read(HASH_CHUNK_BYTES), b""):
             h.update(chunk)
+            fout.write(chunk)
+            size += len(chunk)
+    shutil.copystat(src, dst)
+    METRICS.incr("ingestion_hashed_bytes_total", size)
     return h.hexdigest()
 
 
-def create_session_artifacts(data_dir: str | Path, pdf_path: Path) -> tuple[str, Path, Path, bool]:
-    """Create or reuse one session file for a source PDF.
+def _stored_sha256(session_file: Path) -> str:
+    """Return an archived file's hash from its sidecar, computing it once if missing."""
+    sidecar = session_file.with_name(session_file.name + SHA256_SIDECAR_SUFFIX)
+    try:
+        return sidecar.read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        digest = _file_sha256(session_file)
+        sidecar.write_text(digest, encoding="utf-8")
+        return digest
+
+
+@METRICS.timed("ingestion_session_artifacts")
+def create_session_artifacts(data_dir: str | Path, pdf_path: Path, data: bytes | None = None, src_hash: str | None = None, in_memory: bool = False) -> tuple[str, Path, Path, bool]:
+    """Create or reuse one session file for a source document.
+
+    Pass ``data``/``src_hash`` from ``read_and_hash`` to avoid re-reading the
+    source; otherwise it is hashed while being copied (one read either way).
+    Archived hashes are kept in ``<file>.sha256`` sidecars so earlier
+    versions are never re-hashed. Set ``in_memory`` when ``data`` did not
+    come from ``pdf_path`` on disk (e.g. UI uploads): ``pdf_path`` then only
+    names the file and its timestamps are not copied.
 
     Returns
     -------
@@ -61,28 +135,111 @@ def create_session_artifacts(data_dir: str | Path, pdf_path: Path) -> tuple[str,
     sessions_root = root / "sessions"
     sessions_root.mkdir(parents=True, exist_ok=True)
 
-    src_hash = _file_sha256(pdf_path)
+    partial: Path | None = None
+    if data is not None:
+        size = len(data)
+        src_hash = src_hash or hashlib.sha256(data).hexdigest()
+    else:
+        partial = sessions_root / f".{uuid.uuid4().hex}.partial"
+        src_hash = _copy_and_hash(pdf_path, partial)
+        size = partial.stat().st_size
 
-    # Reuse previously-versioned file if same name + same content hash.
-    for existing in sessions_root.glob(f"*/{pdf_path.name}"):
-        try:
-            if _file_sha256(existing) == src_hash:
-                return existing.parent.name, existing.parent, existing, True
-        except Exception:
-            continue
+    try:
+        # Reuse previously-versioned file if same name + same content hash.
+        for existing in sessions_root.glob(f"*/{glob.escape(pdf_path.name)}"):
+            try:
+                if existing.stat().st_size == size and _stored_sha256(existing) == src_hash:
+                    return existing.parent.name, existing.parent, existing, True
+            except Exception:
+                continue
+
+        session_id = create_pdf_session_id(pdf_path)
+        session_dir = sessions_root / session_id
+        session_dir.mkdir(parents=True, exist_ok=True)
+
+        copied_file = session_dir / pdf_path.name
+        if partial is not None:
+            os.replace(partial, copied_file)
+            partial = None
+        else:
+            copied_file.write_bytes(data)
+            if not in_memory:
+                shutil.copystat(pdf_path, copied_file)
+        copied_file.with_name(copied_file.name + SHA256_SIDECAR_SUFFIX).write_text(src_hash, encoding="utf-8")
+
+        return session_id, session_dir, copied_file, False
+    finally:
+        if partial is not None:
+            partial.unlink(missing_ok=True)
+
+
+def _inmemory_size(path: Path) -> int:
+    """Bytes ``read_and_hash`` will hold for ``path`` (0 if it streams or cannot be stat'ed)."""
+    try:
+        size = path.stat().st_size
+    except OSError:
+        return 0
+    return size if size <= INMEMORY_MAX_BYTES else 0
 
-    session_id = create_pdf_session_id(pdf_path)
-    session_dir = sessions_root / session_id
-    session_dir.mkdir(parents=True, exist_ok=True)
 
-    copied_file = session_dir / pdf_path.name
-    shutil.copy2(pdf_path, copied_file)
+def _prefetch(files: list[Path], max_workers: int = HASH_WORKERS, skip_failed: bool = False, max_bytes: int = PREFETCH_MAX_BYTES) -> Iterator[tuple[Path, bytes | None, str | None]]:
+    """Yield ``(path, data, sha256)`` in order while later files are read/hashed in threads.
 
-    return session_id, session_dir, copied_file, False
+    Read-ahead is bounded by ``2 * max_workers`` files and by ``max_bytes`` of
+    file contents in memory (a yielded file counts until the next one is
+    requested). With ``skip_failed`` a read error is yielded as
+    ``(path, exception, None)``.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest-read") as pool:
+        pending: deque = deque()
+        in_flight = 0
+        queue = deque(files)
+
+        def fill() -> None:
+            nonlocal in_flight
+            while queue and len(pending) < 2 * max_workers:
+                size = _inmemory_size(queue[0])
+                if in_flight and in_flight + size > max_bytes:
+                    break
+                path = queue.popleft()
+                in_flight += size
+                pending.append((path, size, pool.submit(read_and_hash, path)))
+
+        fill()
+        while pending:
+            path, size, future = pending.popleft()
+            try:
+                data, digest = future.result()
+            except Exception as e:
+                if not skip_failed:
+                    raise
+                data, digest = e, None
+            fill()
+            yield path, data, digest
+            in_flight -= size
+            del data
+            fill()
+
+
+def walk_document_files(root: Path, extensions: set[str]) -> list[Path]:
+    """Sorted document paths under ``root`` (``sessions`` pruned); no validation or logging."""
+    files: list[Path] = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        # Ignore archived version files under data_dir/sessions.
+        dirnames[:] = [d for d in dirnames if d != "sessions"]
+        for name in filenames:
+            if os.path.splitext(name)[1].lower() in extensions:
+                files.append(Path(dirpath) / name)
+    files.sort()
+    return files
 
 
-def get_pdf_files(data_dir: str | Path = "data/document_analyzer") -> list[Path]:
-    """Return all PDF paths from a directory (recursive)."""
+def get_document_files(data_dir: str | Path = "data/document_analyzer", extensions: Iterable[str] | None = None) -> list[Path]:
+    """Return all supported document paths from a directory (recursive).
+
+    One ``os.walk`` pass; ``sessions`` folders are pruned before descending
+    and files are matched by extension against the extractor registry.
+    """
     try:
         root = Path(data_dir)
 
@@ -94,15 +251,23 @@ def get_pdf_files(data_dir: str | Path = "data/document_analyzer") -> list[Path]
         if not root.exists() or not root.is_dir():
             raise FileNotFoundError(f"Directory not found: {root}")
 
-        # Ignore archived version files under data_dir/sessions.
-        pdfs = sorted(p for p in root.rglob("*.pdf") if "sessions" not in p.relative_to(root).parts)
-        log.info("Discovered PDF files", directory=str(root), count=len(pdfs))
-        return pdfs
+        wanted = {e.lower() for e in extensions} if extensions is not None else supported_extensions()
+
+        files = walk_document_files(root, wanted)
+
+        log.info("Discovered document files", directory=str(root), count=len(files), extensions=sorted(wanted))
+        return files
     except Exception as e:
-        log.error("Failed to discover PDF files", directory=str(data_dir), error=str(e))
-        raise DocumentPortalException(f"Failed to get PDF files from: {data_dir}", e) from e
+        log.error("Failed to discover document files", directory=str(data_dir), error=str(e))
+        raise DocumentPortalException(f"Failed to get document files from: {data_dir}", e) from e
+
+
+def get_pdf_files(data_dir: str | Path = "data/document_analyzer") -> list[Path]:
+    """Return all PDF paths from a directory (recursive)."""
+    return get_document_files(data_dir, extensions=[".pdf"])
 
 
+@METRICS.timed("ingestion_enrich_metadata")
 def enrich_metadata(doc: Document, data_dir: str | Path = "data/document_analyzer", session_id: str | None = None, session_file: str | None = None, session_dir: str | None = None) -> Document:
     """Add structured metadata fields to one document."""
     src = Path(str(doc.metadata.get("source", "")))
@@ -125,39 +290,87 @@ def enrich_metadata(doc: Document, data_dir: str | Path = "data/document_analyze
     return doc
 
 
-def load_pdfs(data_dir: str | Path = "data/document_analyzer") -> list[Document]:
-    """Load PDFs and create one session folder per PDF file."""
+def load_files(data_dir: str | Path, files: Iterable[Path], skip_failed: bool = False) -> list[Document]:
+    """Ingest specific files under ``data_dir``: archive each in a session folder and extract it.
+
+    Each file is streamed through its format's extractor page by page (or
+    section by section) into ``enrich_metadata``. Files with no registered
+    extractor are skipped. With ``skip_failed=True`` a failing file is
+    reported through the shared rate-limited reporter and the batch goes on;
+    repeats are summarized when the reporter's window closes, not per call.
+    """
+    root = Path(data_dir)
+    if not root.is_absolute():
+        root = Path.cwd() / root
+
+    files = [Path(f) for f in files if get_extractor(Path(f)) is not None]
+    all_docs: list[Document] = []
+
+    # Each file is read from disk once: the bytes are hashed, archived and parsed.
+    for path, data, digest in _prefetch(files, skip_failed=skip_failed):
+        if isinstance(data, Exception):
+            report_exception(f"Failed to read document: {path}", data)
+            continue
+        try:
+            all_docs.extend(_load_one(root, path, data, digest))
+        except Exception as e:
+            if not skip_failed:
+                raise
+            report_exception(f"Failed to ingest document: {path}", e)
+            METRICS.incr("ingestion_files_failed_total")
+
+    return all_docs
+
+
+def _load_one(root: Path, path: Path, data: bytes | None, digest: str | None) -> list[Document]:
+    extractor = get_extractor(path)
+    fmt = path.suffix.lower().lstrip(".")
+    sid, sdir, sfile, reused = create_session_artifacts(root, path, data=data, src_hash=digest)
+
+    log.info("Loading document", source_file=str(path), format=fmt, session_id=sid, session_dir=str(sdir), session_file=str(sfile), reused_session_file=reused)
+
+    docs: list[Document] = []
+    with METRICS.timed("ingestion_extract", format=fmt):
+        # Large files were not kept in memory: parse the fresh (page-cached) archive copy.
+        for doc in extractor(sfile if data is None else path, data):
+            doc.metadata["source"] = str(path)
+            docs.append(enrich_metadata(doc, root, session_id=sid, session_dir=str(sdir), session_file=str(sfile)))
+    # Page signatures let later batch comparisons skip reparsing this version.
+    if not signatures_path(sfile).exists():
+        with METRICS.timed("ingestion_signatures", format=fmt):
+            write_page_signatures(sfile, [doc.page_content for doc in docs])
+    METRICS.incr("ingestion_files_total", reused=str(reused).lower(), format=fmt)
+    METRICS.incr("ingestion_pages_total", len(docs), format=fmt)
+
+    log.info("Document processed", source_file=str(path), pages=len(docs), session_id=sid)
+    return docs
+
+
+def load_documents(data_dir: str | Path = "data/document_analyzer", extensions: Iterable[str] | None = None) -> list[Document]:
+    """Load every supported document and create one session folder per file."""
     try:
         root = Path(data_dir)
         if not root.is_absolute():
             root = Path.cwd() / root
 
         # Reuse file discovery for validation + logging.
-        pdfs = get_pdf_files(root)
-        if not pdfs:
-            log.info("No PDF files found", directory=str(root))
+        files = get_document_files(root, extensions)
+        if not files:
+            log.info("No document files found", directory=str(root))
             return []
 
-        all_docs: list[Document] = []
-
-        for pdf in pdfs:
-            sid, sdir, sfile, reused = create_session_artifacts(root, pdf)
-
-            log.info("Loading PDF", source_pdf=str(pdf), session_id=sid, session_dir=str(sdir), session_file=str(sfile), reused_session_file=reused)
-
-            loader = PyPDFLoader(str(pdf))
-            docs = loader.load()
+        all_docs = load_files(root, files)
 
-            docs = [enrich_metadata(doc, root, session_id=sid, session_dir=str(sdir), session_file=str(sfile)) for doc in docs]
-            all_docs.extend(docs)
-
-            log.info("PDF processed", source_pdf=str(pdf), pages=len(docs), session_id=sid)
-
-        log.info("PDF loading completed", directory=str(root), files=len(pdfs), documents=len(all_docs))
+        log.info("Document loading completed", directory=str(root), files=len(files), documents=len(all_docs))
         return all_docs
     except Exception as e:
-        log.error("Failed to load PDFs", directory=str(data_dir), error=str(e))
-        raise DocumentPortalException(f"Failed to load PDFs from: {data_dir}", e) from e
+        log.error("Failed to load documents", directory=str(data_dir), error=str(e))
+        raise DocumentPortalException(f"Failed to load documents from: {data_dir}", e) from e
+
+
+def load_pdfs(data_dir: str | Path = "data/document_analyzer") -> list[Document]:
+    """Load PDFs and create one session folder per PDF file."""
+    return load_documents(data_dir, extensions=[".pdf"])
 
 
 # if __name__ == "__main__":
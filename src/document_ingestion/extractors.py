@@ -0,0 +1,138 @@
+"""Per-format text extractors that stream pages/sections as LangChain Documents.
+
+Every extractor yields ``Document`` objects with ``source`` and a 0-based
+``page`` in metadata, so ``enrich_metadata`` treats all formats the same.
+Extractors take the file path plus, optionally, its already-read bytes so
+ingestion can parse without touching the disk again.
+Register new formats with ``@register_extractor(".ext", ...)``.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, TextIO
+import io
+import re
+
+import docx2txt
+from langchain_community.document_loaders.parsers.pdf import PyPDFParser
+from langchain_core.documents import Document
+from langchain_core.documents.base import Blob
+
+
+# Target size of one text "page" for formats without real pages.
+SECTION_CHARS = 4000
+
+# ATX headings ("# Title" .. "###### Title") and code fences (``` or ~~~).
+_MD_HEADING_RE = re.compile(r"^ {0,3}(#{1,6})(?:[ \t]+(.*?))?[ \t#]*$")
+_MD_FENCE_RE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+
+Extractor = Callable[[Path, bytes | None], Iterator[Document]]
+
+EXTRACTORS: dict[str, Extractor] = {}
+
+
+def register_extractor(*extensions: str) -> Callable[[Extractor], Extractor]:
+    """Register ``func`` as the extractor for the given file extensions."""
+    def decorator(func: Extractor) -> Extractor:
+        for ext in extensions:
+            EXTRACTORS[ext.lower()] = func
+        return func
+
+    return decorator
+
+
+def supported_extensions() -> set[str]:
+    return set(EXTRACTORS)
+
+
+def get_extractor(path: Path) -> Extractor | None:
+    return EXTRACTORS.get(path.suffix.lower())
+
+
+def _open_text(path: Path, data: bytes | None) -> TextIO:
+    if data is not None:
+        return io.StringIO(data.decode("utf-8", errors="replace"))
+    return path.open("r", encoding="utf-8", errors="replace")
+
+
+def _section_doc(path: Path, index: int, text: str, fmt: str, title: str | None = None) -> Document:
+    metadata = {"source": str(path), "page": index, "format": fmt}
+    if title:
+        metadata["section_title"] = title
+    return Document(page_content=text, metadata=metadata)
+
+
+def _iter_sections(lines: Iterable[str], max_chars: int = SECTION_CHARS, split_on_headings: bool = False) -> Iterator[tuple[str, str | None]]:
+    """Group lines into ``(text, heading)`` sections.
+
+    Sections break at a blank line once ``max_chars`` is reached (and, for
+    Markdown, before every ATX heading outside fenced code blocks), so text
+    is never cut mid-paragraph unless a single paragraph exceeds
+    ``max_chars`` on its own.
+    """
+    buf: list[str] = []
+    size = 0
+    heading: str | None = None
+    fence: str | None = None
+
+    for line in lines:
+        line = line.rstrip("\r\n")
+        match = None
+        if split_on_headings:
+            fence_match = _MD_FENCE_RE.match(line)
+            if fence_match:
+                marker = fence_match.group(1)
+                if fence is None:
+                    fence = marker
+                elif marker[0] == fence[0] and len(marker) >= len(fence):
+                    fence = None
+            elif fence is None:
+                match = _MD_HEADING_RE.match(line)
+        is_heading = match is not None
+        if (is_heading and size) or (size >= max_chars and not line.strip()) or size >= 2 * max_chars:
+            text = "\n".join(buf).strip()
+            if text:
+                yield text, heading
+            buf, size = [], 0
+        if is_heading:
+            heading = (match.group(2) or "").strip() or heading
+        buf.append(line)
+        size += len(line) + 1
+
+    text = "\n".join(buf).strip()
+    if text:
+        yield text, heading
+
+
+@register_extractor(".pdf")
+def extract_pdf(path: Path, data: bytes | None = None) -> Iterator[Document]:
+    """Stream PDF pages (same output as ``PyPDFLoader``)."""
+    blob = Blob.from_data(data, path=str(path)) if data is not None else Blob.from_path(str(path))
+    for doc in PyPDFParser().lazy_parse(blob):
+        doc.metadata["format"] = "pdf"
+        yield doc
+
+
+@register_extractor(".txt")
+def extract_text(path: Path, data: bytes | None = None) -> Iterator[Document]:
+    """Stream a plain-text file in paragraph-aligned sections."""
+    with _open_text(path, data) as f:
+        for index, (text, _) in enumerate(_iter_sections(f)):
+            yield _section_doc(path, index, text, "txt")
+
+
+@register_extractor(".md", ".markdown")
+def extract_markdown(path: Path, data: bytes | None = None) -> Iterator[Document]:
+    """Stream a Markdown file, one section per heading (size-capped)."""
+    with _open_text(path, data) as f:
+        for index, (text, heading) in enumerate(_iter_sections(f, split_on_headings=True)):
+            yield _section_doc(path, index, text, "markdown", heading)
+
+
+@register_extractor(".docx")
+def extract_docx(path: Path, data: bytes | None = None) -> Iterator[Document]:
+    """Extract DOCX text and yield it in paragraph-aligned sections."""
+    text = docx2txt.process(io.BytesIO(data) if data is not None else str(path)) or ""
+    for index, (section, _) in enumerate(_iter_sections(text.splitlines())):
+        yield _section_doc(path, index, section, "docx")
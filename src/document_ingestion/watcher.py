@@ -0,0 +1,312 @@
+"""Continuous ingestion: watch a data directory and ingest new/changed files.
+
+File events come from ``watchdog`` (inotify on Linux, FSEvents/ReadDirectoryChanges
+elsewhere); if it is missing, a polling fallback compares directory snapshots
+and a warning is logged at start.
+Events are debounced until a file's size and mtime stop changing, then
+ready files are ingested (and optionally analyzed) in micro-batches.
+
+Run with:
+    python -m src.document_ingestion.watcher --data-dir data/document_analyzer --analyze
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable
+import argparse
+import os
+import threading
+import time
+
+from langchain_core.documents import Document
+
+from logger.custom_logger import CustomLogger
+from utils.metrics import METRICS
+from exception.custom_exception import report_exception
+from src.document_ingestion.data_ingestion import get_document_files, load_files, walk_document_files
+from src.document_ingestion.extractors import supported_extensions
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # Declared dependency; polling is a degraded fallback.
+    FileSystemEventHandler = object
+    Observer = None
+
+
+log = CustomLogger().get_logger(__file__)
+
+# Names produced by editors/browsers/copy tools while a file is still being written.
+_TEMP_PREFIXES = (".", "~$")
+_TEMP_SUFFIXES = (".tmp", ".part", ".partial", ".crdownload", ".swp")
+
+# Characters of each document sent to the analyzer (same cap as test.py).
+MAX_ANALYSIS_CHARS = 12000
+
+BatchCallback = Callable[[list[Document], dict[str, Any]], None]
+
+
+def _stat_key(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class _EventHandler(FileSystemEventHandler):
+    """Forward watchdog file events to the watcher."""
+
+    def __init__(self, watcher: "DocumentWatcher"):
+        self.watcher = watcher
+
+    def on_any_event(self, event) -> None:
+        if event.is_directory or event.event_type == "deleted":
+            return
+        self.watcher.notify(getattr(event, "dest_path", None) or event.src_path)
+
+
+class _PollingSource:
+    """Fallback event source: stat-snapshot the tree every ``interval`` seconds."""
+
+    def __init__(self, watcher: "DocumentWatcher", interval: float):
+        self.watcher = watcher
+        self.interval = interval
+        self._snapshot: dict[Path, tuple[int, int] | None] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ingest-poll", daemon=True)
+
+    def start(self) -> None:
+        self._snapshot = {p: _stat_key(p) for p in self.watcher.discover(quiet=True)}
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            current = {p: _stat_key(p) for p in self.watcher.discover(quiet=True)}
+            for path, key in current.items():
+                if self._snapshot.get(path) != key:
+                    self.watcher.notify(path)
+            self._snapshot = current
+
+
+class DocumentWatcher:
+    """Debounced, micro-batched ingestion of files dropped into ``data_dir``."""
+
+    def __init__(
+        self,
+        data_dir: str | Path = "data/document_analyzer",
+        debounce_seconds: float = 2.0,
+        batch_size: int = 16,
+        tick_seconds: float = 0.5,
+        analyze: bool = False,
+        on_batch: BatchCallback | None = None,
+        force_polling: bool = False,
+        poll_interval: float = 5.0,
+        initial_scan: bool = True,
+    ):
+        root = Path(data_dir)
+        if not root.is_absolute():
+            root = Path.cwd() / root
+        self.root = root
+        self.debounce_seconds = debounce_seconds
+        self.batch_size = batch_size
+        self.tick_seconds = tick_seconds
+        self.on_batch = on_batch
+        self.initial_scan = initial_scan
+        self.extensions = supported_extensions()
+        self.analyzer = None
+        if analyze:
+            from src.document_analyzer.data_analysis import DocumentAnalyzer
+
+            self.analyzer = DocumentAnalyzer()
+
+        self._use_polling = force_polling or Observer is None
+        self._poll_interval = poll_interval
+        self._source: Any = None
+
+        # path -> (last change seen, last (size, mtime_ns))
+        self._pending: dict[Path, tuple[float, tuple[int, int] | None]] = {}
+        # path -> (size, mtime_ns) at last successful ingestion
+        self._ingested: dict[Path, tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    # ── event intake ──────────────────────────────────────────────────────
+
+    def discover(self, quiet: bool = False) -> list[Path]:
+        """List candidate files; ``quiet`` skips logging (used by every polling pass)."""
+        if quiet:
+            return walk_document_files(self.root, self.extensions) if self.root.is_dir() else []
+        return get_document_files(self.root, self.extensions)
+
+    def _is_candidate(self, path: Path) -> bool:
+        try:
+            rel = path.relative_to(self.root)
+        except ValueError:
+            return False
+        if "sessions" in rel.parts[:-1]:
+            return False
+        name = path.name
+        if name.startswith(_TEMP_PREFIXES) or name.lower().endswith(_TEMP_SUFFIXES):
+            return False
+        return path.suffix.lower() in self.extensions
+
+    def notify(self, path: str | Path) -> None:
+        """Record a change to ``path``; it is ingested once it has been quiet for the debounce window."""
+        path = Path(os.fsdecode(path))
+        if not self._is_candidate(path):
+            return
+        with self._lock:
+            self._pending[path] = (time.monotonic(), _stat_key(path))
+        METRICS.incr("watcher_events_total")
+
+    # ── processing ────────────────────────────────────────────────────────
+
+    def _take_ready(self) -> list[Path]:
+        """Pop files whose size/mtime has been stable for ``debounce_seconds``."""
+        now = time.monotonic()
+        ready: list[Path] = []
+        with self._lock:
+            for path, (changed_at, last_key) in list(self._pending.items()):
+                key = _stat_key(path)
+                if key is None:
+                    del self._pending[path]
+                elif key != last_key:
+                    self._pending[path] = (now, key)
+                elif now - changed_at >= self.debounce_seconds:
+                    del self._pending[path]
+                    if self._ingested.get(path) != key:
+                        ready.append(path)
+        return sorted(ready)
+
+    def _analyze(self, docs: list[Document]) -> dict[str, Any]:
+        """Run the analyzer once per source file in the batch."""
+        by_source: dict[str, list[Document]] = {}
+        for doc in docs:
+            by_source.setdefault(str(doc.metadata.get("source", "")), []).append(doc)
+        results: dict[str, Any] = {}
+        for source, src_docs in by_source.items():
+            text = "\n".join(d.page_content for d in src_docs)[:MAX_ANALYSIS_CHARS]
+            try:
+                results[source] = self.analyzer.analyze_document(text)
+            except Exception as e:
+                log.error("Watcher analysis failed", source_file=source, error=str(e))
+        return results
+
+    def process_batch(self, files: list[Path]) -> list[Document]:
+        """Ingest (and optionally analyze) one micro-batch, then invoke ``on_batch``."""
+        keys = {path: _stat_key(path) for path in files}
+        with METRICS.timed("watcher_batch"):
+            docs = load_files(self.root, files, skip_failed=True)
+            analyses = self._analyze(docs) if self.analyzer is not None and docs else {}
+        for path, key in keys.items():
+            if key is not None:
+                self._ingested[path] = key
+        METRICS.incr("watcher_files_ingested_total", len(files))
+        log.info("Watcher batch ingested", files=len(files), documents=len(docs), analyzed=len(analyses))
+        if self.on_batch is not None:
+            try:
+                self.on_batch(docs, analyses)
+            except Exception as e:
+                # The batch is already ingested/analyzed; never replay it for a callback error.
+                report_exception(f"Watcher on_batch callback failed for {len(files)} files", e)
+                METRICS.incr("watcher_callback_failed_total")
+        return docs
+
+    def _report_failure(self, path: Path, error: Exception) -> None:
+        # Keep watching; the file is retried on its next change event.
+        report_exception(f"Watcher failed to process: {path}", error)
+        METRICS.incr("watcher_files_failed_total")
+
+    def poll_once(self) -> int:
+        """Process every ready file in micro-batches; return how many were ingested."""
+        ready = self._take_ready()
+        for start in range(0, len(ready), self.batch_size):
+            batch = ready[start:start + self.batch_size]
+            try:
+                self.process_batch(batch)
+                continue
+            except Exception as e:
+                if len(batch) == 1:
+                    self._report_failure(batch[0], e)
+                    continue
+            # Isolate the failing file: retry the batch one file at a time.
+            for path in batch:
+                if path in self._ingested and self._ingested[path] == _stat_key(path):
+                    continue  # already ingested before the batch failed
+                try:
+                    self.process_batch([path])
+                except Exception as e:
+                    self._report_failure(path, e)
+        return len(ready)
+
+    # ── lifecycle ─────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        """Start the event source (and queue existing files if ``initial_scan``)."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        if self._use_polling:
+            if Observer is None:
+                log.warning("watchdog is not installed; falling back to polling the whole tree", directory=str(self.root), poll_interval=self._poll_interval)
+            self._source = _PollingSource(self, self._poll_interval)
+            self._source.start()
+        else:
+            self._source = Observer()
+            self._source.schedule(_EventHandler(self), str(self.root), recursive=True)
+            self._source.start()
+        log.info("Watcher started", directory=str(self.root), mode="polling" if self._use_polling else "events")
+
+        if self.initial_scan:
+            # One-time catch-up for files dropped while the watcher was down;
+            # already-archived content is reused, not re-copied.
+            for path in self.discover():
+                self.notify(path)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._source is not None:
+            self._source.stop()
+            if not self._use_polling:
+                self._source.join()
+            self._source = None
+        log.info("Watcher stopped", directory=str(self.root))
+
+    def run_forever(self) -> None:
+        """Start watching and process ready files until ``stop()`` or Ctrl+C."""
+        self.start()
+        try:
+            while not self._stop.wait(self.tick_seconds):
+                self.poll_once()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Watch a directory and ingest new/changed documents")
+    parser.add_argument("--data-dir", default="data/document_analyzer")
+    parser.add_argument("--debounce", type=float, default=2.0, help="Seconds a file must be unchanged before ingestion")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--analyze", action="store_true", help="Also run DocumentAnalyzer on each new file")
+    parser.add_argument("--poll", action="store_true", help="Force the polling fallback instead of OS events")
+    parser.add_argument("--poll-interval", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    DocumentWatcher(
+        args.data_dir,
+        debounce_seconds=args.debounce,
+        batch_size=args.batch_size,
+        analyze=args.analyze,
+        force_polling=args.poll,
+        poll_interval=args.poll_interval,
+    ).run_forever()
+
+
+if __name__ == "__main__":
+    main()
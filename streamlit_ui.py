@@ -4,10 +4,130 @@ streamlit_ui.py
 Streamlit frontend for the Document Portal.
 
 Run with:  streamlit run streamlit_ui.py
+
+Streamlit reruns this script on every widget interaction, so the expensive
+parts are cached:
+- the DocumentAnalyzer (and its ModelLoader/LLM) via ``st.cache_resource``;
+- extracted pages and analysis results via ``st.cache_data`` keyed by the
+  upload's SHA-256, so re-uploading or interacting never re-parses/re-calls.
+On the first upload of a file, pages are rendered as they are extracted and
+the analysis fields as the model streams them; both are then stored in the
+cache, and reruns render straight from it.
 """
 
+from collections import OrderedDict
+import hashlib
+from pathlib import Path
+
 import streamlit as st
 
+from src.document_ingestion.data_ingestion import create_session_artifacts, enrich_metadata
+from src.document_ingestion.extractors import get_extractor, supported_extensions
+from src.document_compare.page_signatures import signatures_path, write_page_signatures
+
+DATA_DIR = Path("data/document_analyzer")
+MAX_ANALYSIS_CHARS = 12000
+# Pages rendered individually; the rest are summarized to keep the page responsive.
+MAX_PREVIEW_PAGES = 50
+PREVIEW_CHARS = 3000
+# Cache sizes; the digest trackers below are bounded to the same sizes.
+INGEST_CACHE_ENTRIES = 32
+ANALYSIS_CACHE_ENTRIES = 64
+
+
+@st.cache_resource(show_spinner="Loading model...")
+def get_analyzer():
+    """One DocumentAnalyzer per server process (shared by all sessions)."""
+    from src.document_analyzer.data_analysis import DocumentAnalyzer
+
+    return DocumentAnalyzer()
+
+
+@st.cache_resource
+def _extracted_digests() -> OrderedDict[str, None]:
+    """Content hashes (LRU order) whose pages are in the ``ingest_upload`` cache."""
+    return OrderedDict()
+
+
+@st.cache_resource
+def _analyzed_digests() -> OrderedDict[str, None]:
+    """Content hashes (LRU order) whose analysis is in the ``analyze_upload`` cache."""
+    return OrderedDict()
+
+
+def _is_cached(digests: OrderedDict[str, None], digest: str) -> bool:
+    """Check (and refresh) a tracked digest, mirroring the cache's LRU order.
+
+    A digest the cache has evicted anyway just makes the cached call recompute.
+    """
+    try:
+        digests.move_to_end(digest)
+    except KeyError:  # never seen, or dropped by another session's rerun
+        return False
+    return True
+
+
+def _mark_cached(digests: OrderedDict[str, None], digest: str, max_entries: int) -> None:
+    digests.pop(digest, None)
+    digests[digest] = None
+    while len(digests) > max_entries:
+        try:
+            digests.popitem(last=False)
+        except KeyError:  # emptied concurrently
+            break
+
+
+def _iter_pages(file_name: str, data: bytes, digest: str):
+    """Archive the upload in a session folder and stream its pages as dicts."""
+    sid, sdir, sfile, reused = create_session_artifacts(DATA_DIR, Path(file_name), data=data, src_hash=digest, in_memory=True)
+    extractor = get_extractor(Path(file_name))
+    texts = []
+    for doc in extractor(sfile, data):
+        doc = enrich_metadata(doc, DATA_DIR, session_id=sid, session_dir=str(sdir), session_file=str(sfile))
+        texts.append(doc.page_content)
+        yield {"page_number": doc.metadata.get("page_number"), "text": doc.page_content, "metadata": doc.metadata}
+    if not signatures_path(sfile).exists():
+        write_page_signatures(sfile, texts)
+
+
+@st.cache_data(show_spinner=False, max_entries=INGEST_CACHE_ENTRIES)
+def ingest_upload(digest: str, file_name: str, _data: bytes, _pages: list[dict] | None = None) -> list[dict]:
+    """Return extracted pages for an upload, cached by content hash.
+
+    ``_pages`` (excluded from the cache key) lets the caller store pages it
+    already streamed to the screen instead of extracting them twice.
+    """
+    if _pages is not None:
+        return _pages
+    return list(_iter_pages(file_name, _data, digest))
+
+
+@st.cache_data(show_spinner=False, max_entries=ANALYSIS_CACHE_ENTRIES)
+def analyze_upload(digest: str, _text: str, _result: dict | None = None) -> dict:
+    """Return metadata analysis for an upload, cached by content hash.
+
+    ``_result`` (excluded from the cache key) stores an analysis the caller
+    already streamed to the screen.
+    """
+    if _result is not None:
+        return _result
+    return get_analyzer().analyze_document(_text)
+
+
+def render_analysis(container, result: dict) -> None:
+    with container.container():
+        for key, value in result.items():
+            st.markdown(f"**{key}**")
+            st.write(value)
+
+
+def render_page(container, page: dict) -> None:
+    text = page["text"]
+    preview = text if len(text) <= PREVIEW_CHARS else f"{text[:PREVIEW_CHARS]}..."
+    with container.expander(f"Page {page['page_number']} · {len(text):,} chars"):
+        st.text(preview)
+
+
 # Page configuration
 st.set_page_config(page_title="Document Portal", layout="wide")
 
@@ -15,8 +135,51 @@ st.title("📄 Document Portal")
 st.write("Upload and analyze your documents using AI.")
 
 # File uploader
-uploaded_file = st.file_uploader("Upload a document", type=["pdf", "docx", "txt"])
+extensions = sorted(ext.lstrip(".") for ext in supported_extensions())
+uploaded_file = st.file_uploader("Upload a document", type=extensions)
 
 if uploaded_file is not None:
+    data = uploaded_file.getvalue()
+    digest = hashlib.sha256(data).hexdigest()
     st.success(f"Uploaded: {uploaded_file.name}")
-    # TODO: Add document processing logic here
+
+    pages_col, analysis_col = st.columns([3, 2])
+    pages_col.subheader("Pages")
+    analysis_col.subheader("Analysis")
+    page_area = pages_col.container()
+    analysis_area = analysis_col.empty()
+
+    try:
+        if _is_cached(_extracted_digests(), digest):
+            pages = ingest_upload(digest, uploaded_file.name, data)
+            for page in pages[:MAX_PREVIEW_PAGES]:
+                render_page(page_area, page)
+        else:
+            # First time this content is seen: show pages as they are extracted.
+            pages = []
+            progress = pages_col.empty()
+            for page in _iter_pages(uploaded_file.name, data, digest):
+                pages.append(page)
+                if len(pages) <= MAX_PREVIEW_PAGES:
+                    render_page(page_area, page)
+                progress.caption(f"Extracted {len(pages)} pages...")
+            progress.empty()
+            ingest_upload(digest, uploaded_file.name, data, _pages=pages)
+            _mark_cached(_extracted_digests(), digest, INGEST_CACHE_ENTRIES)
+
+        if len(pages) > MAX_PREVIEW_PAGES:
+            pages_col.caption(f"Showing the first {MAX_PREVIEW_PAGES} of {len(pages)} pages.")
+
+        text = "\n".join(p["text"] for p in pages)[:MAX_ANALYSIS_CHARS]
+        if _is_cached(_analyzed_digests(), digest):
+            render_analysis(analysis_area, analyze_upload(digest, text))
+        else:
+            # First analysis of this content: show fields as the model streams them.
+            analysis_area.caption("Analyzing document...")
+            result = {}
+            for result in get_analyzer().stream_analysis(text):
+                render_analysis(analysis_area, result)
+            analyze_upload(digest, text, _result=result)
+            _mark_cached(_analyzed_digests(), digest, ANALYSIS_CACHE_ENTRIES)
+    except Exception as e:
+        st.error(f"Failed to process {uploaded_file.name}: {e}")
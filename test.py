@@ -4,6 +4,7 @@ from pathlib import Path
 
 from src.document_ingestion.data_ingestion import load_pdfs
 from src.document_analyzer.data_analysis import DocumentAnalyzer
+from utils.metrics import METRICS
 
 
 DATA_DIR = Path("data/document_analyzer")
@@ -43,6 +44,8 @@ def main() -> None:
 
 	except Exception as e:
 		print(f"Test failed: {e}")
+	finally:
+		print("\n" + METRICS.format_summary())
 
 
 if __name__ == "__main__":
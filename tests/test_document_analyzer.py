@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from benchmarks.fakes import FAKE_METADATA, LatencyFakeChatModel
+from src.document_analyzer.data_analysis import DocumentAnalyzer
+from utils.metrics import METRICS
+
+
+class ScriptedChatModel(LatencyFakeChatModel):
+    """Returns ``responses`` in order (the last one repeats)."""
+
+    responses: list[str]
+    calls: int = 0
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.response = self.responses[min(self.calls, len(self.responses) - 1)]
+        self.calls += 1
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+
+FULL = json.dumps(FAKE_METADATA)
+
+
+def _tiers() -> dict[str, float]:
+    counters = METRICS.snapshot()["counters"]
+    return {name: value for name, value in counters.items() if name.startswith("analyzer_parse_tier_total")}
+
+
+def _analyze(*responses: str) -> tuple[dict, ScriptedChatModel, dict[str, float]]:
+    METRICS.reset()
+    llm = ScriptedChatModel(responses=list(responses))
+    result = DocumentAnalyzer(llm=llm, structured_output=False).analyze_document("some document")
+    return result, llm, _tiers()
+
+
+@pytest.mark.parametrize("response", [FULL, f"```json\n{FULL}\n```"])
+def test_complete_json_is_direct(response):
+    result, llm, tiers = _analyze(response)
+    assert result == FAKE_METADATA
+    assert llm.calls == 1
+    assert tiers == {'analyzer_parse_tier_total{tier="direct"}': 1}
+
+
+def test_truncated_json_is_repaired_locally():
+    truncated = f"```json\n{FULL[: FULL.index('Neutral') + 3]}"
+    result, llm, tiers = _analyze(truncated)
+    assert result["SentimentTone"] == "Neu"
+    assert result["PageCount"] == "Not Available"
+    assert llm.calls == 1
+    assert tiers == {'analyzer_parse_tier_total{tier="local_repair"}': 1}
+
+
+def test_incomplete_metadata_uses_llm_fix():
+    # Valid JSON, but cut before required fields: not repairable locally.
+    cut = FULL[: FULL.index(', "PageCount"')]
+    result, llm, tiers = _analyze(cut, FULL)
+    assert result == FAKE_METADATA
+    assert llm.calls == 2
+    assert tiers == {'analyzer_parse_tier_total{tier="llm_fix"}': 1}
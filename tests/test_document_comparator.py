@@ -0,0 +1,107 @@
+import random
+
+import pytest
+
+from src.document_compare import page_signatures
+from src.document_compare.document_comparator import compare_against_archive
+from src.document_compare.page_signatures import load_page_signatures, signatures_path, write_page_signatures
+
+
+def _page(seed: int, words: int = 200) -> str:
+    rng = random.Random(seed)
+    return " ".join(f"w{rng.randrange(5000)}" for _ in range(words))
+
+
+def _archive(data_dir, session_id, file_name, pages):
+    session_dir = data_dir / "sessions" / session_id
+    session_dir.mkdir(parents=True)
+    session_file = session_dir / file_name
+    session_file.write_text("\n".join(pages), encoding="utf-8")
+    write_page_signatures(session_file, pages)
+    return session_file
+
+
+def _statuses(changes):
+    return [(c["page"], c["status"], c["matched_page"]) for c in changes]
+
+
+def test_unchanged_modified_added_removed(tmp_path):
+    old = [_page(1), _page(2), _page(3)]
+    _archive(tmp_path, "s1", "report.pdf", old)
+    edited = old[1].replace(old[1].split()[100], "EDITED", 1)
+    new = [old[0], edited, _page(4)]
+
+    result = compare_against_archive(new, tmp_path, file_name="report.pdf")
+
+    assert result["versions_compared"] == 1 and result["missing_signatures"] == 0
+    assert _statuses(result["change_maps"]["s1"]) == [
+        (0, "unchanged", 0),
+        (1, "modified", 1),
+        (2, "added", None),
+        (None, "removed", 2),
+    ]
+    (rank,) = result["ranking"]
+    assert (rank["unchanged"], rank["modified"], rank["added"], rank["removed"]) == (1, 1, 1, 1)
+    assert 0 < rank["similarity"] < 1
+
+
+def test_identical_version_ranks_first(tmp_path):
+    pages = [_page(1), _page(2)]
+    _archive(tmp_path, "same", "a.txt", pages)
+    _archive(tmp_path, "other", "a.txt", [_page(8), _page(9)])
+
+    result = compare_against_archive(pages, tmp_path, file_name="a.txt")
+
+    assert [r["session_id"] for r in result["ranking"]] == ["same", "other"]
+    assert result["ranking"][0]["similarity"] == 1.0
+    assert result["ranking"][1]["added"] == 2 and result["ranking"][1]["removed"] == 2
+
+
+def test_top_k_limits_ranking_and_change_maps(tmp_path):
+    base = [_page(1), _page(2)]
+    _archive(tmp_path, "s1", "a.txt", base)
+    _archive(tmp_path, "s2", "a.txt", [base[0], _page(5)])
+    _archive(tmp_path, "s3", "a.txt", [_page(6), _page(7)])
+
+    result = compare_against_archive(base, tmp_path, file_name="a.txt", top_k=2)
+
+    assert result["versions_compared"] == 3
+    assert [r["session_id"] for r in result["ranking"]] == ["s1", "s2"]
+    assert set(result["change_maps"]) == {"s1", "s2"}
+
+
+@pytest.mark.parametrize("new_pages, archived_pages", [([], [_page(1)]), ([_page(1)], []), ([], [])])
+def test_zero_page_documents(tmp_path, new_pages, archived_pages):
+    _archive(tmp_path, "s1", "blank.txt", archived_pages)
+
+    result = compare_against_archive(new_pages, tmp_path, file_name="blank.txt")
+
+    (rank,) = result["ranking"]
+    assert rank["added"] == len(new_pages) and rank["removed"] == len(archived_pages)
+    assert rank["similarity"] == (1.0 if not new_pages and not archived_pages else 0.0)
+
+
+def test_exclude_session_and_missing_signatures(tmp_path):
+    _archive(tmp_path, "self", "a[1].pdf", [_page(1)])
+    _archive(tmp_path, "old", "a[1].pdf", [_page(1)])
+    unsigned = tmp_path / "sessions" / "nosig"
+    unsigned.mkdir()
+    (unsigned / "a[1].pdf").write_bytes(b"%PDF")
+
+    result = compare_against_archive([_page(1)], tmp_path, file_name="a[1].pdf", exclude_session_id="self")
+
+    assert [r["session_id"] for r in result["ranking"]] == ["old"]
+    assert result["missing_signatures"] == 1
+
+
+def test_loaded_signatures_are_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(page_signatures, "MAX_LOADED_SIGNATURES", 3)
+    monkeypatch.setattr(page_signatures, "_LOADED", page_signatures.OrderedDict())
+    paths = [signatures_path(_archive(tmp_path, f"s{i}", "a.txt", [_page(i)])) for i in range(5)]
+
+    for path in paths:
+        load_page_signatures(path)
+    load_page_signatures(paths[2])  # refresh: now most recently used
+    load_page_signatures(paths[0])  # reload evicts the least recent (paths[3])
+
+    assert list(page_signatures._LOADED) == [paths[4], paths[2], paths[0]]
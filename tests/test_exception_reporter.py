@@ -0,0 +1,58 @@
+import gc
+import time
+import weakref
+
+from exception.custom_exception import DocumentPortalException, ExceptionReporter
+
+
+def test_distinct_errors_are_bounded():
+    reporter = ExceptionReporter(window_seconds=60, max_windows=100)
+    for i in range(5000):
+        reporter.report(KeyError(f"key-{i}"))
+    assert len(reporter._seen) == 100
+
+
+def test_closed_windows_are_dropped():
+    reporter = ExceptionReporter(window_seconds=0.05)
+    for i in range(50):
+        reporter.report(KeyError(f"key-{i}"))
+    time.sleep(0.1)
+    reporter.report(KeyError("fresh"))
+    assert list(reporter._seen) == [("KeyError", None, None, "'fresh'")]
+
+
+def test_windows_do_not_keep_exceptions_alive():
+    class Payload:
+        pass
+
+    def fail(payload):
+        raise ValueError("boom")
+
+    reporter = ExceptionReporter()
+    payload = Payload()
+    ref = weakref.ref(payload)
+    try:
+        fail(payload)
+    except ValueError as e:
+        reporter.report(DocumentPortalException("wrapped", e))
+    del payload
+    gc.collect()
+    assert ref() is None
+    assert len(reporter._seen) == 1
+
+
+def test_unraised_errors_are_keyed_by_message():
+    reporter = ExceptionReporter()
+    assert reporter.report(KeyError("a"))
+    assert reporter.report(KeyError("b"))
+    assert not reporter.report(KeyError("a"))
+
+
+def test_repeats_keep_distinct_subjects():
+    reporter = ExceptionReporter(max_subjects=2)
+    key = ("same",)
+    for name in ("bad1.pdf", "bad2.pdf", "bad3.pdf", "bad4.pdf"):
+        reporter.report(Exception(name), key=key)
+    window = reporter._seen[key]
+    assert (window.first, window.suppressed, window.subjects) == ("bad1.pdf", 3, ["bad2.pdf", "bad3.pdf"])
+    reporter.flush()
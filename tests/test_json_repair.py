@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from utils.json_repair import repair_json
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        # Markdown code fences.
+        ('```json\n{"Title": "t"}\n```', {"Title": "t"}),
+        ('```\n[1, 2]\n```', [1, 2]),
+        # Prose around the payload, including braces in the trailing prose.
+        ('Here you go: {"Title": "t"} Hope this helps!', {"Title": "t"}),
+        ('{"Title": "t"} Note: {x}', {"Title": "t"}),
+        ('{"a": {"b": [1, 2]}} and [3]', {"a": {"b": [1, 2]}}),
+        # Brackets and escaped quotes inside strings are not structure.
+        ('{"Title": "a } b ] \\" c"} trailing }', {"Title": 'a } b ] " c'}),
+        # Trailing commas.
+        ('{"a": [1, 2,], "b": 3,}', {"a": [1, 2], "b": 3}),
+        ('{"a": [1, 2 ,\n ]\n,\n}', {"a": [1, 2]}),
+        ('{"a": "x,]"}', {"a": "x,]"}),
+        # Truncated output.
+        ('{"Title": "t", "Summary": ["one", "tw', {"Title": "t", "Summary": ["one", "tw"]}),
+        ('{"Title": "t", "Author":', {"Title": "t", "Author": None}),
+        ('{"Summary": ["one",', {"Summary": ["one"]}),
+    ],
+)
+def test_repair_json(raw, expected):
+    assert json.loads(repair_json(raw)) == expected
+
+
+def test_valid_json_is_unchanged():
+    text = '{"Title": "t", "Summary": ["a", "b"], "PageCount": 3}'
+    assert repair_json(text) == text
+
+
+def test_many_commas_is_linear():
+    # A quadratic rescan would take seconds here.
+    text = "[" + ",".join(["1"] * 200_000) + ",]"
+    assert json.loads(repair_json(text)) == [1] * 200_000
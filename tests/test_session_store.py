@@ -0,0 +1,116 @@
+import threading
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from src.document_chat import session_store
+from src.document_chat.session_store import ChatSessionStore, estimate_tokens
+
+
+def _contents(store, session_id):
+    return [m.content for m in store.get_history(session_id)]
+
+
+def test_messages_round_trip_as_langchain_messages():
+    store = ChatSessionStore()
+    store.add_turn("s", "question", "answer")
+    history = store.get_history("s")
+    assert [type(m) for m in history] == [HumanMessage, AIMessage]
+    assert [m.content for m in history] == ["question", "answer"]
+
+
+def test_lru_eviction_without_spill():
+    store = ChatSessionStore(max_sessions=2)
+    for sid in ("a", "b"):
+        store.add_message(sid, "user", sid)
+    store.get_history("a")  # "a" becomes most recent
+    store.add_message("c", "user", "c")
+    assert "b" not in store and "a" in store and "c" in store
+    assert store.get_history("b") == []
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(session_store.time, "monotonic", lambda: now[0])
+    store = ChatSessionStore(ttl_seconds=10)
+    store.add_message("s", "user", "hello")
+    now[0] += 5
+    assert _contents(store, "s") == ["hello"]
+    now[0] += 11
+    assert store.get_history("s") == []
+    assert len(store) == 0
+
+
+def test_spill_and_restore(tmp_path):
+    store = ChatSessionStore(max_sessions=1, sqlite_path=tmp_path / "spill.db")
+    store.add_turn("a", "q1", "a1")
+    store.add_message("b", "user", "other")  # spills "a"
+    assert "a" not in store
+    assert _contents(store, "a") == ["q1", "a1"]  # restored from disk
+    assert "a" in store and "b" not in store
+    store.close()
+
+    reopened = ChatSessionStore(max_sessions=1, sqlite_path=tmp_path / "spill.db")
+    assert _contents(reopened, "b") == ["other"]
+    reopened.close()
+
+
+def test_clear_removes_memory_and_spill(tmp_path):
+    store = ChatSessionStore(max_sessions=1, sqlite_path=tmp_path / "spill.db")
+    store.add_message("a", "user", "x")
+    store.add_message("b", "user", "y")
+    store.clear("a")
+    assert store.get_history("a") == []
+    store.close()
+
+
+def test_overflow_is_folded_into_summary():
+    calls = []
+
+    def summarizer(summary, turns):
+        calls.append(list(turns))
+        return f"summary of {len(turns)}"
+
+    store = ChatSessionStore(max_history_tokens=40, keep_recent_messages=2, summarizer=summarizer)
+    for i in range(4):
+        store.add_message("s", "user", f"{i}" * 100)
+    history = store.get_history("s")
+    assert isinstance(history[0], SystemMessage)
+    assert history[0].content.endswith("summary of 1")
+    assert [m.content[0] for m in history[1:]] == ["2", "3"]
+    assert calls == [[("h", "0" * 100)], [("h", "1" * 100)]]
+    session = store._sessions["s"]
+    assert session.tokens == estimate_tokens(session.summary) + sum(estimate_tokens(t) for _, t in session.turns)
+
+
+def test_history_stays_complete_while_summarizing():
+    started, release = threading.Event(), threading.Event()
+
+    def slow_summarizer(summary, turns):
+        started.set()
+        release.wait(5)
+        return "folded"
+
+    store = ChatSessionStore(max_history_tokens=40, keep_recent_messages=1, summarizer=slow_summarizer)
+    store.add_message("s", "user", "a" * 100)
+    writer = threading.Thread(target=store.add_message, args=("s", "ai", "b" * 100))
+    writer.start()
+    assert started.wait(5)
+    # Mid-summarization: the turns being folded are still visible.
+    assert _contents(store, "s") == ["a" * 100, "b" * 100]
+    release.set()
+    writer.join(5)
+    assert _contents(store, "s") == ["Summary of earlier conversation:\nfolded", "b" * 100]
+
+
+def test_summary_survives_spill_during_summarization(tmp_path):
+    store = None
+
+    def summarizer(summary, turns):
+        store.add_message("other", "user", "evicts s")  # spills "s" mid-call
+        return "kept"
+
+    store = ChatSessionStore(max_sessions=1, max_history_tokens=40, keep_recent_messages=1, summarizer=summarizer, sqlite_path=tmp_path / "spill.db")
+    store.add_message("s", "user", "a" * 100)
+    store.add_message("s", "ai", "b" * 100)
+    assert _contents(store, "s") == ["Summary of earlier conversation:\nkept", "b" * 100]
+    store.close()
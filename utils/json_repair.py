@@ -0,0 +1,118 @@
+"""
+json_repair.py
+---------------
+Local, LLM-free repair of the JSON defects models commonly produce:
+markdown code fences, prose around the payload, trailing commas and
+output truncated mid-array/object (e.g. hitting ``max_output_tokens``).
+"""
+
+import re
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)\s*(?:```|$)", re.DOTALL)
+
+
+def strip_fences(text: str) -> str:
+    """Return the body of the first markdown code fence (or ``text`` if there is none)."""
+    match = _FENCE_RE.search(text)
+    return match.group(1) if match else text
+
+
+def _extract_payload(text: str) -> str:
+    """Return the first top-level ``{...}``/``[...]`` value, dropping prose around it.
+
+    If that value never closes (truncated output), everything from its
+    opening bracket on is kept so ``_close_truncated`` can finish it.
+    """
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        return text
+    text = text[min(starts):]
+    depth = 0
+    in_string = escape = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[: i + 1]
+    return text
+
+
+def _balance(text: str) -> tuple[list[str], bool]:
+    """Return (unclosed bracket stack, inside-string flag) after scanning ``text``."""
+    stack: list[str] = []
+    in_string = escape = False
+    for ch in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append(ch)
+        elif ch in "}]" and stack:
+            stack.pop()
+    return stack, in_string
+
+
+def _drop_trailing_commas(text: str) -> str:
+    """Remove commas directly followed by ``}`` or ``]`` (outside strings), in one pass."""
+    out: list[str] = []
+    pending_comma = -1  # index in ``out`` of a comma seen only whitespace since
+    in_string = escape = False
+    for ch in text:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if not ch.isspace():
+            if ch in "}]" and pending_comma != -1:
+                out[pending_comma] = ""
+            pending_comma = -1
+        if ch == '"':
+            in_string = True
+        elif ch == ",":
+            pending_comma = len(out)
+        out.append(ch)
+    if pending_comma != -1:
+        out[pending_comma] = ""
+    return "".join(out)
+
+
+def _close_truncated(text: str) -> str:
+    """Close an unterminated string and any open arrays/objects."""
+    stack, in_string = _balance(text)
+    if in_string:
+        text += '"'
+    if not stack:
+        return text
+    text = text.rstrip().rstrip(",").rstrip()
+    if text.endswith(":"):
+        text += " null"
+    closers = {"{": "}", "[": "]"}
+    return text + "".join(closers[ch] for ch in reversed(stack))
+
+
+def repair_json(text: str) -> str:
+    """Return ``text`` with common, mechanically fixable JSON defects repaired."""
+    text = _extract_payload(strip_fences(text.strip()))
+    return _drop_trailing_commas(_close_truncated(text))
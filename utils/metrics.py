@@ -0,0 +1,194 @@
+"""
+metrics.py
+-----------
+Lightweight in-process instrumentation: counters, latency histograms and a
+``timed`` helper that works as a context manager or decorator.
+
+Exposed as Prometheus text (``/metrics`` in ``app.py``) and as a per-run
+summary for CLI scripts (``test.py``).
+"""
+
+import bisect
+import functools
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+# Prometheus-style latency buckets in seconds.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Recent samples kept per histogram for percentile estimates.
+RESERVOIR_SIZE = 2048
+
+METRIC_PREFIX = "document_portal_"
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: dict[str, Any] | None) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def _format_labels(key: LabelKey, extra: dict[str, str] | None = None) -> str:
+    pairs = list(key) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{v}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+class Histogram:
+    """Cumulative bucket counts plus a bounded reservoir for percentiles."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.samples: deque[float] = deque(maxlen=RESERVOIR_SIZE)
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.bucket_counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class MetricsRegistry:
+    """Thread-safe store of counters and histograms keyed by name + labels."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[LabelKey, float]] = {}
+        self._histograms: dict[str, dict[LabelKey, Histogram]] = {}
+
+    def incr(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Add ``value`` to a counter."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Record one histogram sample (seconds for ``*_seconds`` metrics)."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = Histogram()
+            hist.observe(value)
+
+    def timed(self, name: str, **labels: Any) -> "_Timer":
+        """Time a block or function into histogram ``<name>_seconds``.
+
+        ``with METRICS.timed("ingestion_sha256"):`` or ``@METRICS.timed("x")``.
+        Failures also increment ``<name>_errors_total``.
+        """
+        return _Timer(self, name, labels)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return counters and histogram stats as plain dicts (for JSON/CLI)."""
+        with self._lock:
+            counters = {
+                name + _format_labels(key): value
+                for name, series in self._counters.items()
+                for key, value in series.items()
+            }
+            histograms = {
+                name + _format_labels(key): {
+                    "count": hist.count,
+                    "sum": hist.total,
+                    "p50": hist.percentile(0.50),
+                    "p95": hist.percentile(0.95),
+                    "p99": hist.percentile(0.99),
+                }
+                for name, series in self._histograms.items()
+                for key, hist in series.items()
+            }
+        return {"counters": counters, "histograms": histograms}
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: list[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                metric = METRIC_PREFIX + name
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in series.items():
+                    lines.append(f"{metric}{_format_labels(key)} {value}")
+
+            for name, series in sorted(self._histograms.items()):
+                metric = METRIC_PREFIX + name
+                lines.append(f"# TYPE {metric} histogram")
+                for key, hist in series.items():
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets, hist.bucket_counts):
+                        cumulative += count
+                        lines.append(f"{metric}_bucket{_format_labels(key, {'le': str(bound)})} {cumulative}")
+                    lines.append(f"{metric}_bucket{_format_labels(key, {'le': '+Inf'})} {hist.count}")
+                    lines.append(f"{metric}_sum{_format_labels(key)} {hist.total}")
+                    lines.append(f"{metric}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def format_summary(self) -> str:
+        """Return a human-readable per-run summary table."""
+        snap = self.snapshot()
+        lines = ["=== METRICS SUMMARY ==="]
+        for name, stats in sorted(snap["histograms"].items()):
+            lines.append(
+                f"{name:<48} n={stats['count']:<6} total={stats['sum']:.3f}s "
+                f"p50={stats['p50'] * 1000:.1f}ms p95={stats['p95'] * 1000:.1f}ms p99={stats['p99'] * 1000:.1f}ms"
+            )
+        for name, value in sorted(snap["counters"].items()):
+            lines.append(f"{name:<48} {value:g}")
+        return "\n".join(lines)
+
+
+class _Timer:
+    """Context manager / decorator returned by ``MetricsRegistry.timed``."""
+
+    def __init__(self, registry: MetricsRegistry, name: str, labels: dict[str, Any]):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self._start = 0.0
+        self.elapsed = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.elapsed = time.perf_counter() - self._start
+        self.registry.observe(f"{self.name}_seconds", self.elapsed, **self.labels)
+        if exc_type is not None:
+            self.registry.incr(f"{self.name}_errors_total", **self.labels)
+        return False
+
+    def __call__(self, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Timer(self.registry, self.name, self.labels):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+
+# Process-wide registry shared by all modules.
+METRICS = MetricsRegistry()